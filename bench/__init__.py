@@ -0,0 +1,13 @@
+"""Benchmarks comparing the record implementations of the tutorial.
+
+    python -m bench                          # everything, as a table
+    python -m bench --impl pt6 --scenario set
+    python -m bench --json out.json          # keep the numbers
+    python -m bench --baseline out.json      # exit 1 on regressions
+"""
+from bench.runner import compare, format_table, measure, memory_per_instance, run
+
+
+def main(argv=None):
+    from bench.__main__ import main
+    return main(argv)
@@ -0,0 +1,40 @@
+import argparse
+import sys
+
+import bench
+from bench.cases import IMPLEMENTATIONS, SCENARIOS
+from bench.runner import compare, dump, format_table, load, run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench', description=bench.__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--impl', action='append', choices=list(IMPLEMENTATIONS),
+                        help='implementation to run, repeatable (default: all)')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS) + ['memory'],
+                        help='scenario to run, repeatable (default: all)')
+    parser.add_argument('--number', type=int, default=50000, help='executions per repeat')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='write results as JSON')
+    parser.add_argument('--baseline', metavar='PATH', help='fail on regressions against this JSON')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed slowdown of the median against the baseline (default: 0.1)')
+    args = parser.parse_args(argv)
+
+    report = run(args.impl, args.scenario, args.number, args.repeat, args.warmup)
+    print('median per operation, ns (memory in bytes per instance)')
+    print(format_table(report))
+    if args.json:
+        dump(report, args.json)
+    if args.baseline:
+        regressions = compare(report, load(args.baseline), args.tolerance)
+        for impl, scenario, before, after in regressions:
+            print(f'REGRESSION {impl}/{scenario}: {before:.1f} -> {after:.1f}')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import contextlib
+import io
+
+# The tutorial modules print as they go, keep that out of benchmark output.
+with contextlib.redirect_stdout(io.StringIO()):
+    import pt4_master_of_dot as pt4
+    import pt5_boost1 as pt5
+    import pt6_boost2 as pt6
+
+
+ARGS = "'Fred Fuches', 'USD', 50.9"
+
+# Each implementation is described by the class to benchmark and a class body template,
+# the latter is only used to time class definitions.
+IMPLEMENTATIONS = {
+    'simple': {
+        'cls': pt4.SimpleAccount,
+        'define': (
+            'class Defined:\n'
+            '    def __init__(self, name, currency, balance):\n'
+            '        self.name = name\n'
+            '        self.currency = currency\n'
+            '        self.balance = balance\n'
+        ),
+        'validates': False,
+    },
+    'pt4': {
+        'cls': pt4.Account4,
+        'define': (
+            'class Defined(pt4.Structure):\n'
+            '    name = pt4.String()\n'
+            '    currency = pt4.String()\n'
+            '    balance = pt4.PosFloat()\n'
+        ),
+        'validates': True,
+    },
+    'pt5': {
+        'cls': pt5.Account,
+        'define': (
+            'class Defined(pt5.AccountBase):\n'
+            '    name = pt5.String()\n'
+            '    currency = pt5.String()\n'
+            '    balance = pt5.PosFloat()\n'
+        ),
+        'validates': True,
+    },
+    'pt6': {
+        'cls': pt6.Account,
+        'define': (
+            'class Defined(pt6.AccountBase):\n'
+            '    name = pt6.String()\n'
+            '    currency = pt6.String()\n'
+            '    balance = pt6.PosFloat()\n'
+        ),
+        'validates': True,
+    },
+    'pt6-slotted': {
+        'cls': pt6.SlottedAccount,
+        'define': (
+            'class Defined(pt6.AccountBase, slots=True):\n'
+            '    name = pt6.String()\n'
+            '    currency = pt6.String()\n'
+            '    balance = pt6.PosFloat()\n'
+        ),
+        'validates': True,
+    },
+}
+
+# Scenario -> statement timed against the namespace built by `namespace()`.
+SCENARIOS = {
+    'create': f'cls({ARGS})',
+    'set': 'obj.balance = 50.9',
+    'get': 'obj.balance',
+    'fail': (
+        'try:\n'
+        '    obj.balance = -1.0\n'
+        'except ValueError:\n'
+        '    pass'
+    ),
+    'define': 'exec(define, env)',
+}
+
+
+def namespace(impl):
+    spec = IMPLEMENTATIONS[impl]
+    cls = spec['cls']
+    return {
+        'cls': cls,
+        'obj': cls('Fred Fuches', 'USD', 50.9),
+        'define': compile(spec['define'], '<bench>', 'exec'),
+        'env': {'pt4': pt4, 'pt5': pt5, 'pt6': pt6},
+    }
+
+
+def applies(impl, scenario):
+    return scenario != 'fail' or IMPLEMENTATIONS[impl]['validates']
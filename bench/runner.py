@@ -0,0 +1,100 @@
+import gc
+import json
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+
+from bench.cases import IMPLEMENTATIONS, SCENARIOS, applies, namespace
+
+# One measurement is `number` executions of a statement, repeated `repeat` times after
+# `warmup` throwaway rounds. Times are reported per execution, in nanoseconds.
+def measure(stmt, env, number=50000, repeat=7, warmup=1):
+    timer = timeit.Timer(stmt, globals=env)
+    for _ in range(warmup):
+        timer.timeit(number)
+    samples = [t / number * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'unit': 'ns',
+    }
+
+
+def memory_per_instance(cls, count=10000):
+    """Bytes allocated per instance, the list holding them is not counted"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        holder = [None] * count
+        base = tracemalloc.get_traced_memory()[0]
+        for i in range(count):
+            holder[i] = cls('Fred Fuches', 'USD', 50.9)
+        used = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    return {'min': used / count, 'median': used / count, 'mean': used / count, 'stdev': 0.0,
+            'unit': 'bytes'}
+
+
+def run(impls=None, scenarios=None, number=50000, repeat=7, warmup=1):
+    impls = impls or list(IMPLEMENTATIONS)
+    scenarios = scenarios or list(SCENARIOS) + ['memory']
+    results = {}
+    for impl in impls:
+        env = namespace(impl)
+        results[impl] = {}
+        for scenario in scenarios:
+            if scenario == 'memory':
+                results[impl][scenario] = memory_per_instance(env['cls'])
+            elif applies(impl, scenario):
+                # Defining classes is a lot slower than the rest, keep the runtime sane.
+                n = max(1, number // 100) if scenario == 'define' else number
+                results[impl][scenario] = measure(SCENARIOS[scenario], env, n, repeat, warmup)
+    return {
+        'meta': {
+            'python': sys.version,
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'number': number,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance=0.1):
+    """Lists (impl, scenario, baseline, current) where the median got slower by more than `tolerance`"""
+    regressions = []
+    for impl, scenarios in report['results'].items():
+        for scenario, stats in scenarios.items():
+            try:
+                before = baseline['results'][impl][scenario]['median']
+            except KeyError:
+                continue
+            if stats['median'] > before * (1 + tolerance):
+                regressions.append((impl, scenario, before, stats['median']))
+    return regressions
+
+
+def format_table(report):
+    seen = {s for stats in report['results'].values() for s in stats}
+    scenarios = [s for s in list(SCENARIOS) + ['memory'] if s in seen]
+    lines = ['impl'.ljust(14) + ''.join(s.rjust(12) for s in scenarios)]
+    for impl, stats in report['results'].items():
+        cells = (f"{stats[s]['median']:.1f}" if s in stats else '-' for s in scenarios)
+        lines.append(impl.ljust(14) + ''.join(c.rjust(12) for c in cells))
+    return '\n'.join(lines)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def dump(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,117 @@
+"""Construction and assignment throughput from 1 to N threads, plus a class creation race.
+
+    python -m bench.threads                  # 1, 2, 4, ... up to the cpu count
+    python -m bench.threads --threads 16 --impl pt6-slotted
+
+With the GIL, throughput stays flat however many threads run, on a free-threaded build
+it should scale with the cores. The race check defines lazy classes from every thread at
+once and fails if any thread saw an error or a duplicate descriptor class.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from bench.cases import IMPLEMENTATIONS, pt6
+
+
+def gil_enabled():
+    return getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+def _run_threads(threads, target):
+    """Runs `target(index)` in `threads` threads started together, returns wall seconds"""
+    barrier = threading.Barrier(threads + 1)
+    errors = []
+
+    def worker(index):
+        barrier.wait()
+        try:
+            target(index)
+        except BaseException as exc:
+            errors.append(exc)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return elapsed
+
+
+def throughput(cls, threads, operations):
+    """(instances/s, assignments/s) with `threads` threads doing `operations` each"""
+    def create(_):
+        for _ in range(operations):
+            cls('Fred Fuches', 'USD', 50.9)
+
+    # One object per thread, threads writing the same object would measure contention.
+    objs = [cls('Fred Fuches', 'USD', 50.9) for _ in range(threads)]
+
+    def assign(index):
+        obj = objs[index]
+        for _ in range(operations):
+            obj.balance = 50.9
+
+    total = threads * operations
+    return total / _run_threads(threads, create), total / _run_threads(threads, assign)
+
+
+def race(threads, classes=20):
+    """Defines `classes` lazy record classes per thread concurrently, and uses them"""
+    defined = [[] for _ in range(threads)]
+
+    def define(index):
+        for i in range(classes):
+            env = {'pt6': pt6}
+            exec(f'class Raced{index}_{i}(pt6.AccountBase, slots={i % 2 == 0}, lazy=True):\n'
+                 '    name = pt6.String()\n'
+                 '    balance = pt6.PosFloat()\n', env)
+            cls = env[f'Raced{index}_{i}']
+            obj = cls('Fred Fuches', 50.9)
+            obj.balance = 1.0
+            defined[index].append(cls)
+
+    _run_threads(threads, define)
+    # Same shape, same flavor: every `name` descriptor of the non slotted classes must
+    # have ended up with one and the same specialised class.
+    flavors = {type(cls.__dict__['name']) for classes_ in defined for cls in classes_[1::2]}
+    if len(flavors) != 1:
+        raise AssertionError(f'{len(flavors)} descriptor classes for the same specialisation')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench.threads', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--impl', default='pt6', choices=[k for k, v in IMPLEMENTATIONS.items()
+                                                           if v['validates']])
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1, help='most threads to run')
+    parser.add_argument('--operations', type=int, default=100000, help='operations per thread')
+    args = parser.parse_args(argv)
+
+    cls = IMPLEMENTATIONS[args.impl]['cls']
+    print(f'{sys.version.split()[0]}, GIL {"enabled" if gil_enabled() else "disabled"}, '
+          f'{os.cpu_count()} cpus, {args.impl}')
+    counts = [1]
+    while counts[-1] * 2 <= args.threads:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.threads:
+        counts.append(args.threads)
+    print(f'{"threads":>8} {"instances/s":>14} {"assignments/s":>14}')
+    for threads in counts:
+        created, assigned = throughput(cls, threads, args.operations)
+        print(f'{threads:>8} {created:>14.0f} {assigned:>14.0f}')
+
+    race(max(args.threads, 4))
+    print('concurrent class creation: ok')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import inspect
+import time
+from functools import wraps
+
+from pt2_debug_metacls_approach import DebugMeta
+
+# `DebugMeta` is a nice vehicle: whatever `decorate` does to a class, it does to the whole
+# hierarchy. Printing names is not that useful though, what we usually want to know
+# is where the time goes. Let's measure every method instead:
+#   - how many calls;
+#   - how much time in total;
+#   - a latency histogram, with power of 2 buckets, i.e. `duration.bit_length()`.
+# Cheap enough to keep on, and no external profiler needed.
+#
+# Stats are keyed by `__qualname__`, so methods of different classes never mix.
+class MethodStats:
+    __slots__ = ('count', 'total_ns', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.buckets = [0] * 64
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns / self.count if self.count else 0.0,
+            # bucket k holds durations in [2**(k-1), 2**k) ns
+            'histogram': {1 << k: n for k, n in enumerate(self.buckets) if n},
+        }
+
+
+_stats = {}
+
+
+# Like `betterdebug`, coroutines are awaited, so their time includes the awaits, and
+# async generators are iterated, only the steps are timed, not the consumer in between.
+# pt20 goes further and tells running from suspended time.
+def profiled(func):
+    stats = _stats.setdefault(func.__qualname__, MethodStats())
+    buckets = stats.buckets
+    now = time.perf_counter_ns
+
+    def record(elapsed):
+        stats.count += 1
+        stats.total_ns += elapsed
+        buckets[elapsed.bit_length()] += 1
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = now()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(now() - start)
+    elif inspect.isasyncgenfunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            agen = func(*args, **kwargs)
+            elapsed = 0
+            try:
+                while True:
+                    start = now()
+                    try:
+                        item = await agen.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        elapsed += now() - start
+                    yield item
+            finally:
+                await agen.aclose()
+                record(elapsed)
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = now()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = now() - start
+                stats.count += 1
+                stats.total_ns += elapsed
+                buckets[elapsed.bit_length()] += 1
+    return wrapper
+
+
+def profilemethods(cls):
+    # Unlike `debugmethod`, classmethods and staticmethods are handled too:
+    # profile the function underneath and wrap it back into the same descriptor.
+    for name, val in list(vars(cls).items()):
+        if isinstance(val, (classmethod, staticmethod)):
+            setattr(cls, name, type(val)(profiled(val.__func__)))
+        elif callable(val) and not isinstance(val, type):
+            setattr(cls, name, profiled(val))
+    return cls
+
+
+class ProfileMeta(DebugMeta):
+    decorate = staticmethod(profilemethods)
+
+
+def snapshot():
+    """{qualname: {'count', 'total_ns', 'mean_ns', 'histogram'}} of every profiled method"""
+    return {qualname: stats.snapshot() for qualname, stats in _stats.items()}
+
+
+def reset():
+    for stats in _stats.values():
+        stats.__init__()
+
+
+def report(top=10):
+    """Slowest methods by total time, as text"""
+    rows = sorted(snapshot().items(), key=lambda item: item[1]['total_ns'], reverse=True)[:top]
+    lines = [f'{"method":40}{"calls":>10}{"total ms":>12}{"mean ns":>12}']
+    for qualname, s in rows:
+        lines.append(f'{qualname:40}{s["count"]:>10}{s["total_ns"] / 1e6:>12.3f}{s["mean_ns"]:>12.0f}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    class Service(metaclass=ProfileMeta):
+        def handle(self, n):
+            return sum(self.parse(str(i)) for i in range(n))
+
+        def parse(self, raw):
+            return int(raw)
+
+        @classmethod
+        def create(cls):
+            return cls()
+
+        @staticmethod
+        def slow():
+            time.sleep(0.01)
+
+    class Derived(Service):
+        def parse(self, raw):
+            return super().parse(raw) * 2
+
+    Service.create().handle(1000)
+    Derived.create().handle(1000)
+    Service.slow()
+    print(report())
+    print(snapshot()['Service.slow'])
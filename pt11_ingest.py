@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+from collections import namedtuple
+from itertools import islice
+from types import SimpleNamespace
+
+from pt4_master_of_dot import Structure
+from pt6_boost2 import AccountBase
+from pt7_columnar import Table
+from pt21_invariants import check_records
+
+# Real data rarely shows up as nicely typed python objects, it comes from CSV dumps and
+# JSON-lines feeds, tens of GB of them. The naive way:
+#
+#   for row in csv.reader(f):
+#       accounts.append(Account(row[0], row[1], float(row[2])))
+#
+# keeps everything in memory and dies on the first bad row. Our classes know a lot more
+# than that though: the field names, and what every descriptor expects. So a loader can:
+#   - map columns to fields by name;
+#   - coerce text to what the descriptor expects, `float('50.9')`;
+#   - validate a chunk at a time, column by column, with `validate_many` when there is one;
+#   - yield instances, or columnar `Table` batches, as it goes;
+#   - put bad rows aside, with one error per offending field, and carry on.
+
+RowError = namedtuple('RowError', 'number row errors')
+RowError.__doc__ = 'A rejected row: its 1-based number in the stream, the raw row, {field: exception}'
+
+
+def fields_of(cls):
+    if issubclass(cls, AccountBase):
+        return list(cls._fields)
+    if issubclass(cls, Structure):
+        return list(cls._signature.parameters)
+    raise TypeError('Expected an AccountBase or Structure subclass')
+
+
+def _validator(descriptor):
+    """Returns values -> [(index, exception)] for any of our descriptors"""
+    if hasattr(descriptor, 'validate_many'):
+        return descriptor.validate_many
+    # pt4 descriptors only have `__set__`, they write into a scratch object.
+    probe = SimpleNamespace()
+
+    def validate_many(values):
+        failures = []
+        for index, value in enumerate(values):
+            try:
+                descriptor.__set__(probe, value)
+            except (TypeError, ValueError) as exc:
+                failures.append((index, exc))
+        return failures
+    return validate_many
+
+
+def _coercer(descriptor):
+    expected = getattr(descriptor, 'expected', None)
+    if expected is None or expected is str or expected is object:
+        return None
+    return expected
+
+
+def _needs_coercion(value, expected):
+    # Text from CSV, and ints JSON hands out for round floats.
+    return isinstance(value, str) or (type(value) is int and expected is float)
+
+
+def read_rows(source, format=None):
+    """Rows of a path or file: dicts for CSV with a header and for JSON lines"""
+    if isinstance(source, str):
+        if format is None:
+            format = 'jsonl' if source.endswith(('.jsonl', '.ndjson')) else 'csv'
+        with open(source, newline='') as f:
+            yield from read_rows(f, format)
+        return
+    if format == 'jsonl':
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from csv.DictReader(source)
+
+
+def load(cls, source, format=None, columns=None, chunk_size=10000, errors=None, batches=False):
+    """Streams valid records of `cls` out of `source`.
+
+    `source` is a path, a text file, or any iterable of sequences/dicts. `columns` maps
+    field names to column names (dicts) or positions (sequences), defaults to the fields
+    themselves. Rejected rows are passed to `errors` as `RowError`s, `errors` being a
+    callable or anything with an `append`, rows breaking an invariant under the `None`
+    field. With `batches=True` every chunk is yielded as a `Table` (AccountBase classes)
+    or a {field: list} dict, otherwise instances one by one.
+    """
+    fields = fields_of(cls)
+    descriptors = [getattr(cls, field) for field in fields]
+    validators = [_validator(d) for d in descriptors]
+    coercers = [_coercer(d) for d in descriptors]
+    if columns is None:
+        columns = {}
+    report = getattr(errors, 'append', errors)
+
+    if isinstance(source, (str, io.IOBase)):
+        source = read_rows(source, format)
+    rows = iter(source)
+    number = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        failed = {}
+        values = [[] for _ in fields]
+        for offset, row in enumerate(chunk):
+            for i, field in enumerate(fields):
+                key = columns.get(field, field if isinstance(row, dict) else i)
+                try:
+                    value = row[key]
+                    if coercers[i] is not None and _needs_coercion(value, coercers[i]):
+                        value = coercers[i](value)
+                except (LookupError, TypeError, ValueError) as exc:
+                    failed.setdefault(offset, {})[field] = exc
+                    value = None
+                values[i].append(value)
+        for field, column, validate in zip(fields, values, validators):
+            for offset, exc in validate(column):
+                failed.setdefault(offset, {}).setdefault(field, exc)
+
+        good = [offset for offset in range(len(chunk)) if offset not in failed]
+        if getattr(cls, '_invariants', ()):
+            # Cross-field invariants, a `Table` built with `validated=True` would skip them
+            # and `cls(*record)` would raise in the middle of the stream.
+            broken = check_records(cls, [tuple(column[offset] for column in values) for offset in good])
+            for index, exc in broken:
+                failed[good[index]] = {None: exc}
+            if broken:
+                good = [offset for offset in good if offset not in failed]
+        if failed and report is not None:
+            for offset in sorted(failed):
+                report(RowError(number + offset + 1, chunk[offset], failed[offset]))
+        number += len(chunk)
+
+        records = [tuple(column[offset] for column in values) for offset in good]
+        if batches:
+            if issubclass(cls, AccountBase):
+                yield Table(cls, records, validated=True)
+            else:
+                yield {field: [r[i] for r in records] for i, field in enumerate(fields)}
+        else:
+            for record in records:
+                yield cls(*record)
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    import time
+    from pt6_boost2 import Account
+
+    n = 200000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'accounts.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['name', 'currency', 'balance'])
+            for i in range(n):
+                writer.writerow([f'Fred Fuches {i}', 'USD', -1 if i % 1000 == 0 else i * 0.5])
+
+        rejected = []
+        start = time.perf_counter()
+        count = sum(1 for _ in load(Account, path, errors=rejected))
+        print(f'{count} instances, {len(rejected)} rejected in {time.perf_counter() - start:.2f}s')
+        print(rejected[0])
+
+        start = time.perf_counter()
+        count = sum(len(t) for t in load(Account, path, batches=True))
+        print(f'{count} rows in columnar batches in {time.perf_counter() - start:.2f}s')
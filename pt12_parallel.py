@@ -0,0 +1,162 @@
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+from pt6_boost2 import AccountBase, build_from_values
+from pt7_columnar import TYPECODES, Table
+from pt21_invariants import check_records
+
+# The fused `__set__` is about as fast as python validation gets, and still a single core
+# caps the ingest. The obvious next step: more cores, i.e. more processes, since the GIL
+# serializes threads (unless you run a free-threaded build, then threads it is).
+#
+# Two things to get right:
+#   - Workers need the record class. Classes pickle by reference, module + qualified name,
+#     and a worker rebuilds one by importing its module, which runs `AccountMeta` again.
+#     The generated `__init__`/`__set__` are named like real methods for the same reason,
+#     see `define` in pt6. So define record classes at module level, not in `__main__`.
+#   - Sending instances back means pickling every one of them, each with its own dict,
+#     that eats most of the gain. Workers send back validated field tuples or,
+#     even more compact, raw column buffers: `array('d').tobytes()` for numeric fields.
+#     The parent only stores the values, no validation twice.
+
+def _validate(cls, rows):
+    """Splits `rows` into validated columns and [(index, {field: exception})]
+
+    A row with the wrong number of values, or breaking an invariant of `cls`, is rejected
+    as a whole, under the `None` key.
+    """
+    fields = cls._fields
+    # `zip` would silently truncate every column to the shortest row, weed those out first.
+    malformed = {index: {None: ValueError(f'Expected {len(fields)} values, got {len(row)}')}
+                 for index, row in enumerate(rows) if len(row) != len(fields)}
+    if malformed:
+        indexes = [index for index in range(len(rows)) if index not in malformed]
+        rows = [rows[index] for index in indexes]
+    columns = [list(column) for column in zip(*rows)] or [[] for _ in fields]
+    failed = {}
+    for field, column in zip(fields, columns):
+        for index, exc in cls.__dict__[field].validate_many(column):
+            failed.setdefault(index, {})[field] = exc
+    if getattr(cls, '_invariants', ()):
+        # Only rows with valid fields, the invariants may not even run on the others.
+        kept = [index for index in range(len(rows)) if index not in failed]
+        records = [tuple(column[index] for column in columns) for index in kept]
+        for index, exc in check_records(cls, records):
+            failed[kept[index]] = {None: exc}
+    if failed:
+        columns = [[v for i, v in enumerate(column) if i not in failed] for column in columns]
+    if malformed:
+        # Back to indexes into the rows given.
+        failed = {indexes[index]: exc for index, exc in failed.items()}
+        failed.update(malformed)
+    return columns, sorted(failed.items())
+
+
+def _work(cls, rows, base, columnar):
+    # Runs in the worker: validation through the fused descriptor code.
+    columns, failed = _validate(cls, rows)
+    errors = [(base + index, exc) for index, exc in failed]
+    if not columnar:
+        return list(zip(*columns)), errors
+    packed = []
+    for field, column in zip(cls._fields, columns):
+        typecode = TYPECODES.get(getattr(cls.__dict__[field], 'expected', None))
+        packed.append((typecode, array(typecode, column).tobytes()) if typecode else (None, column))
+    return packed, errors
+
+
+def _unpack(packed):
+    columns = []
+    for typecode, data in packed:
+        if typecode is None:
+            columns.append(data)
+        else:
+            column = array(typecode)
+            column.frombytes(data)
+            columns.append(column)
+    return columns
+
+
+def free_threaded():
+    return not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def build(cls, rows, workers=None, chunk_size=20000, columnar=False, errors=None, executor=None):
+    """Validates `rows` of `cls` in parallel, yields instances or `Table`s, chunk by chunk.
+
+    Chunks come back in order. Rejected rows go to `errors` (callable or list) as
+    (row index, {field: exception}), the field being None for rows of the wrong length
+    and rows breaking an invariant. Threads are used on free-threaded builds,
+    processes otherwise, unless an executor is given.
+    """
+    if not issubclass(cls, AccountBase):
+        raise TypeError('Expected an AccountBase subclass')
+    report = getattr(errors, 'append', errors)
+    from_values = build_from_values(cls)
+    owned = executor is None
+    if owned:
+        pool = ThreadPoolExecutor if free_threaded() else ProcessPoolExecutor
+        executor = pool(max_workers=workers or os.cpu_count())
+    try:
+        pending = []
+        base = 0
+        # Keep a bounded number of chunks in flight, memory stays flat on huge inputs.
+        window = 2 * (workers or os.cpu_count() or 1)
+        for chunk in _chunks(rows, chunk_size):
+            pending.append(executor.submit(_work, cls, chunk, base, columnar))
+            base += len(chunk)
+            if len(pending) >= window:
+                yield from _collect(pending.pop(0), cls, from_values, columnar, report)
+        for future in pending:
+            yield from _collect(future, cls, from_values, columnar, report)
+    finally:
+        if owned:
+            executor.shutdown(cancel_futures=True)
+
+
+def _collect(future, cls, from_values, columnar, report):
+    result, failed = future.result()
+    if report is not None:
+        for failure in failed:
+            report(failure)
+    if columnar:
+        table = Table(cls)
+        table.extend_columns(_unpack(result), validated=True)
+        yield table
+    else:
+        for values in result:
+            yield from_values(values)
+
+
+if __name__ == '__main__':
+    import time
+    from pt6_boost2 import Account
+
+    n = 400000
+    rows = [(f'Fred Fuches {i}', 'USD', i * 0.5) for i in range(n)]
+    start = time.perf_counter()
+    _validate(Account, rows)
+    serial = time.perf_counter() - start
+    print(f'{os.cpu_count()} cpus, serial validation of {n} rows: {serial:.2f}s')
+
+    counts = [1]
+    while counts[-1] * 2 <= min(16, os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    for workers in counts:
+        for columnar in (False, True):
+            start = time.perf_counter()
+            built = sum(len(t) if columnar else 1 for t in build(Account, rows, workers, columnar=columnar))
+            elapsed = time.perf_counter() - start
+            print(f'workers={workers:<3} columnar={columnar!s:<6} {built / elapsed:>12.0f} rows/s')
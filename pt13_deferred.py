@@ -0,0 +1,215 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from pt6_boost2 import (AccountBase, AccountMeta, RESERVED, SELF, constants_of, define, fold,
+                        fuse, make_fused_init)
+
+# Data coming out of our own database was validated on the way in. Running every `Typed`
+# and `Positive` check again on the way out is pure waste, but there's no way to tell
+# `__init__` so. Let's add one: in trusted mode `__init__` only stores the values and flags
+# the instance as pending. The checks run later:
+#   - explicitly, `instance.validate()`, or in bulk with `validate_all(instances)`;
+#   - or implicitly, on the first read of any field.
+#
+# The pending flag is raised *before* anything is stored, and only cleared once every field
+# passed. Whatever blows up in between, a pending object never hands out unchecked values.
+#
+# Reads have to check the flag, but checking it on every read of every instance would
+# make the whole class pay a python `__get__` for good. So the flag is the class itself:
+# a trusted `__init__` switches the instance to `cls._Pending`, a subclass with the same
+# layout whose fields validate on first read. `validate` switches it back, and from then
+# on reads are the plain `__dict__` (or slot) reads of any other record.
+
+_deferring = ContextVar('deferring', default=False)
+
+
+@contextmanager
+def trusted():
+    """Instances of deferred classes created in this block (thread, task) skip validation"""
+    token = _deferring.set(True)
+    try:
+        yield
+    finally:
+        _deferring.reset(token)
+
+
+class _PendingField:
+    """A field of `cls._Pending`: reads validate first, writes go to the real descriptor"""
+    def __init__(self, descriptor):
+        self.descriptor = descriptor
+        self.name = descriptor.name
+
+    def __get__(self, instance, cls):
+        if instance is None:
+            return self.descriptor
+        instance.validate()
+        return getattr(instance, self.name)
+
+    def __set__(self, instance, value):
+        self.descriptor.__set__(instance, value)
+
+
+def make_pending_class(cls, fields, descriptors):
+    namespace = {field: _PendingField(d) for field, d in zip(fields, descriptors)}
+    # No new slot and no `__dict__`, or `__class__` could not be switched back and forth.
+    namespace.update(__slots__=(), __module__=cls.__module__, _pending=True,
+                     __qualname__=f'{cls.__qualname__}._Pending')
+    # Straight to `type.__new__`, the metaclass has nothing to generate here.
+    return type.__new__(type(cls), f'{cls.__name__}Pending', (cls,), namespace)
+
+
+def make_deferred_init(fields, descriptors, always, env=None):
+    code = f'def __init__(instance, {", ".join(fields)}):\n'
+    # Instances of subclasses inheriting this `__init__` are checked right away, switching
+    # them to `_Pending` and back would turn them into instances of this class.
+    code += f'    if ({always} or _deferring()) and instance.__class__ is _cls:\n'
+    code += '        instance.__class__ = _Pending\n'
+    for i, (field, descriptor) in enumerate(zip(fields, descriptors)):
+        # Folded like the checked branch below, or trusting would not save anything.
+        body = fold('\n'.join(descriptor.statement__store__()), constants_of(descriptor), env, f'_{i}_')
+        if SELF.search(body):
+            code += f'        self = _descriptors[{i}]\n'
+        code += f'        value = {field}\n'
+        for statement in body.split('\n'):
+            code += '        %s\n' % statement
+    code += '        return\n'
+    # The regular body, checks included.
+    code += make_fused_init(fields, descriptors, env).split('\n', 1)[1]
+    return code
+
+
+def make_validate(fields, descriptors):
+    code = 'def validate(instance):\n'
+    code += '    if not instance._pending:\n'
+    code += '        return\n'
+    for i, descriptor in enumerate(descriptors):
+        code += f'    self = _descriptors[{i}]\n'
+        for statement in list(descriptor.statement__load__()) + fuse(type(descriptor)):
+            code += '    %s\n' % statement
+    code += '    instance.__class__ = _cls\n'
+    return code
+
+
+def make_raw_values(fields, descriptors):
+    code = 'def raw_values(instance):\n'
+    code += '    values = []\n'
+    for i, descriptor in enumerate(descriptors):
+        code += f'    self = _descriptors[{i}]\n'
+        for statement in descriptor.statement__load__():
+            code += '    %s\n' % statement
+        code += '    values.append(value)\n'
+    code += '    return values\n'
+    return code
+
+
+DEFERRED = ('_cls', '_Pending', '_deferring')
+
+
+class DeferredMeta(AccountMeta):
+    """`AccountMeta` with deferrable validation, `deferred=True` to always defer"""
+    def __new__(mcs, name, bases, namespace, deferred=None, **kwargs):
+        if deferred is not None:
+            namespace['_always_deferred'] = deferred
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+    def generate_init(cls, fields, descriptors):
+        if set(fields) & set(RESERVED + DEFERRED):
+            raise TypeError(f'Fields named {RESERVED + DEFERRED} cannot be deferred')
+        cls._Pending = make_pending_class(cls, fields, descriptors)
+        env = {'_descriptors': tuple(descriptors), '_deferring': _deferring.get,
+               '_cls': cls, '_Pending': cls._Pending}
+        for name, make in (('validate', make_validate), ('raw_values', make_raw_values)):
+            setattr(cls, name, define(cls, name, make(fields, descriptors), dict(env)))
+        code = make_deferred_init(fields, descriptors, getattr(cls, '_always_deferred', False), env)
+        return define(cls, '__init__', code, env)
+
+
+class DeferredBase(AccountBase, metaclass=DeferredMeta):
+    __slots__ = ()
+    _pending = False
+
+    def validate(self):
+        """Runs the checks skipped at construction, a no-op for validated instances"""
+
+
+def validate_all(instances):
+    """Validates pending instances in bulk, field by field with `validate_many`.
+
+    Returns [(index, exception)] for the instances which failed, those stay pending.
+    """
+    by_class = {}
+    for index, instance in enumerate(instances):
+        if instance._pending:
+            # The class behind `_Pending`, it has the real descriptors.
+            by_class.setdefault(type(instance).__base__, []).append((index, instance))
+    failures = {}
+    for cls, pending in by_class.items():
+        columns = zip(*(instance.raw_values() for _, instance in pending))
+        for field, column in zip(cls._fields, columns):
+            for offset, exc in cls.__dict__[field].validate_many(column):
+                failures.setdefault(pending[offset][0], exc)
+        for index, instance in pending:
+            if index not in failures:
+                instance.__class__ = cls
+    return sorted(failures.items())
+
+
+if __name__ == '__main__':
+    import re
+    import timeit
+    from pt6_boost2 import Descriptor, PosFloat, String
+
+    # Deferring saves the checks, and there isn't much to save on a couple of
+    # `isinstance`. Checks worth deferring look more like this one.
+    class Matching(Descriptor):
+        folded = ('pattern',)
+
+        def __init__(self, *args, pattern, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pattern = re.compile(pattern)
+
+        @staticmethod
+        def statement__set__():
+            return ('if not self.pattern.fullmatch(value):',
+                    '    raise ValueError("Expected %s" % self.pattern.pattern)')
+
+    class IBAN(String, Matching):
+        pass
+
+    class Account(DeferredBase):
+        name = String()
+        currency = String()
+        balance = PosFloat()
+
+    class Transfer(DeferredBase):
+        source = IBAN(pattern=r'[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){3,7}(?: ?[A-Z0-9]{1,4})?')
+        target = IBAN(pattern=r'[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){3,7}(?: ?[A-Z0-9]{1,4})?')
+        amount = PosFloat()
+
+    def construction(cls, rows):
+        checked = min(timeit.repeat(lambda: [cls(*row) for row in rows], number=1, repeat=5))
+        with trusted():
+            deferred = min(timeit.repeat(lambda: [cls(*row) for row in rows], number=1, repeat=5))
+        return checked, deferred
+
+    rows = [('Fred Fuches', 'USD', i * 0.5) for i in range(100000)]
+    transfers = [('DE89 3704 0044 0532 0130 00', 'FR14 2004 1010 0505 0001 3M02 606', i * 0.5)
+                 for i in range(100000)]
+    for cls, rows_ in ((Account, rows), (Transfer, transfers)):
+        checked, deferred = construction(cls, rows_)
+        print(f'100k {cls.__name__}, checked vs trusted: {checked:.3f}s vs {deferred:.3f}s')
+
+    with trusted():
+        accounts = [Account(*row) for row in rows]
+    later = timeit.timeit(lambda: validate_all(accounts), number=1)
+    print(f'bulk validation of 100k trusted accounts afterwards: {later:.3f}s')
+    a, b = accounts[0], Account(*rows[0])
+    reads = [min(timeit.repeat(lambda: x.balance, number=200000, repeat=5)) for x in (a, b)]
+    print(f'200k reads, validated trusted vs checked instance: {reads[0]:.3f}s vs {reads[1]:.3f}s')
+
+    with trusted():
+        bad = Account('Fred Fuches', 'USD', -1.0)
+    try:
+        bad.balance
+    except ValueError as e:
+        print(f'Caught on first read: {e}')
@@ -0,0 +1,227 @@
+import mmap
+import os
+import struct
+import weakref
+
+from pt6_boost2 import AccountBase, codegen_lock, compile_generated, fuse, guards
+from pt21_invariants import check_records
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The descriptors tell us the shape of a record: a `Float` is a C double, a `String` can be
+# a fixed width UTF-8 field. That's all `struct` needs to lay records out in plain bytes:
+#
+#   Account -> '<16s16sd', 40 bytes a record
+#
+# With a layout, a file of accounts is just an array of 40 byte slots. `mmap` it, and
+# records can be read and written in place, paged in and out by the OS, never turned
+# into python objects unless asked for. Writes still go through the fused checks.
+CODES = {float: 'd', int: 'q'}
+DTYPES = {'d': '<f8', 'q': '<i8'}
+
+
+class Layout:
+    """Byte layout of the records of an `AccountBase` subclass"""
+    def __init__(self, cls, widths=None, default_width=16):
+        if not issubclass(cls, AccountBase):
+            raise TypeError('Expected an AccountBase subclass')
+        widths = widths or {}
+        self.cls = cls
+        self.fields = list(cls._fields)
+        self.descriptors = [cls.__dict__[field] for field in self.fields]
+        self.codes = []
+        for field, descriptor in zip(self.fields, self.descriptors):
+            expected = getattr(descriptor, 'expected', None)
+            if expected is str:
+                self.codes.append(f'{widths.get(field, default_width)}s')
+            elif expected in CODES:
+                self.codes.append(CODES[expected])
+            else:
+                raise TypeError(f'No binary layout for field {field!r}')
+        self.struct = struct.Struct('<' + ''.join(self.codes))
+        self.size = self.struct.size
+        self.offsets = []
+        offset = 0
+        for code in self.codes:
+            self.offsets.append(offset)
+            offset += struct.calcsize('<' + code)
+
+    def dtype(self):
+        """The equivalent numpy structured dtype"""
+        if np is None:
+            raise ImportError('numpy is required for dtype()')
+        return np.dtype([(field, DTYPES.get(code, f'S{code[:-1]}'))
+                         for field, code in zip(self.fields, self.codes)])
+
+
+# A view is two slots, a buffer and an offset, plus a generated property per field.
+# Setters run the fused statements of the field descriptor, with `value` and `self`
+# bound exactly like in the generated `__init__`, then its guards, like `__set__` does,
+# the view standing in for the instance. Whole records are checked against the
+# invariants of pt21, like the constructor does.
+def make_store(layout, i, checks=()):
+    code_, offset = layout.codes[i], layout.offsets[i]
+    code = f'    self = _descriptors[{i}]\n'
+    for statement in fuse(type(layout.descriptors[i])) + list(checks):
+        code += '    %s\n' % statement
+    if code_.endswith('s'):
+        code += "    value = value.encode('utf-8')\n"
+        code += f'    if len(value) > {code_[:-1]}:\n'
+        code += f'        raise ValueError("Expected at most {code_[:-1]} bytes")\n'
+    code += f'    _structs[{i}].pack_into(view._buf, view._offset + {offset}, value)\n'
+    return code
+
+
+def make_view(layout):
+    code = ''
+    for i, (field, code_, offset) in enumerate(zip(layout.fields, layout.codes, layout.offsets)):
+        code += '@property\n'
+        code += f'def {field}(view):\n'
+        code += f'    value = _structs[{i}].unpack_from(view._buf, view._offset + {offset})[0]\n'
+        if code_.endswith('s'):
+            code += "    value = value.rstrip(b'\\0').decode('utf-8')\n"
+        code += '    return value\n'
+        code += f'@{field}.setter\n'
+        code += f'def {field}(view, value):\n'
+        code += '    instance = view\n'
+        code += make_store(layout, i, guards(type(layout.descriptors[i])))
+    # Whole records are constructed, not assigned: no guards, `check_records` follows.
+    code += 'def _write(view, values):\n'
+    for i in range(len(layout.fields)):
+        code += f'    value = values[{i}]\n'
+        code += make_store(layout, i)
+    return code
+
+
+def _view_init(self, buf, offset):
+    self._buf = buf
+    self._offset = offset
+
+
+def _view_repr(self):
+    values = ', '.join(repr(getattr(self, field)) for field in self._fields)
+    return f'{type(self).__name__}({values})'
+
+
+# Like `_specialised` in pt6, view classes are shared: every `Records` over the same
+# layout gets the same class, compiled once. The key has the descriptors, not just the
+# record class, a field swapped by `update_field` makes a new view, not a stale one.
+_views = weakref.WeakValueDictionary()
+
+def view_class(layout):
+    key = (layout.cls, tuple(layout.fields), tuple(layout.codes), tuple(map(id, layout.descriptors)))
+    with codegen_lock:
+        view = _views.get(key)
+        if view is None:
+            view = _views[key] = make_view_class(layout)
+    return view
+
+
+def make_view_class(layout):
+    namespace = {
+        '__slots__': ('_buf', '_offset'),
+        '__init__': _view_init,
+        '__repr__': _view_repr,
+        '_fields': layout.fields,
+    }
+    env = {
+        '_structs': [struct.Struct('<' + code) for code in layout.codes],
+        '_descriptors': layout.descriptors,
+    }
+    exec(compile_generated(make_view(layout)), env, namespace)
+    return type(f'{layout.cls.__name__}View', (), namespace)
+
+
+class Records:
+    """Zero-copy sequence of record views over a writable buffer, `mmap` or `memoryview`"""
+    def __init__(self, layout, buf):
+        self.layout = layout
+        self._buf = buf
+        self._view = view_class(layout)
+
+    def __len__(self):
+        return len(self._buf) // self.layout.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('record index out of range')
+        return self._view(self._buf, index * self.layout.size)
+
+    def __setitem__(self, index, values):
+        """Writes a whole record, every field validated first"""
+        view = self[index]
+        if len(values) != len(self.layout.fields):
+            raise TypeError(f'Expected {len(self.layout.fields)} values')
+        # Validate everything on a scratch copy, the record is never left half written.
+        scratch = self._view(bytearray(self.layout.size), 0)
+        scratch._write(values)
+        failures = check_records(self.layout.cls, [tuple(values)])
+        if failures:
+            raise failures[0][1]
+        self._buf[view._offset:view._offset + self.layout.size] = scratch._buf
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_numpy(self):
+        """Zero-copy structured array over the buffer"""
+        return np.frombuffer(self._buf, dtype=self.layout.dtype(), count=len(self))
+
+    def instances(self):
+        """Deserialises everything into instances of the record class, if you really must"""
+        cls, fields = self.layout.cls, self.layout.fields
+        for view in self:
+            yield cls(*(getattr(view, field) for field in fields))
+
+
+def create(path, layout, count):
+    """Creates a zero-filled file for `count` records"""
+    with open(path, 'wb') as f:
+        f.truncate(count * layout.size)
+
+
+def open_records(path, layout, writable=True):
+    """Maps the file at `path`, the mapping stays open as long as the `Records` object lives"""
+    with open(path, 'r+b' if writable else 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return Records(layout, bytearray())
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        return Records(layout, mmap.mmap(f.fileno(), 0, access=access))
+
+
+if __name__ == '__main__':
+    import tempfile
+    import time
+    from pt6_boost2 import Account
+
+    layout = Layout(Account, widths={'name': 32, 'currency': 3})
+    print(f'{layout.struct.format}: {layout.size} bytes a record')
+
+    n = 1000000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'accounts.bin')
+        create(path, layout, n)
+        records = open_records(path, layout)
+        start = time.perf_counter()
+        for i in range(n):
+            records[i].balance = i * 0.5
+        print(f'{n} validated in-place writes: {time.perf_counter() - start:.2f}s')
+        records[0] = ('Fred Fuches', 'USD', 50.9)
+        print(records[0])
+        try:
+            records[1].balance = -1.0
+        except ValueError as e:
+            print(f'Rejected: {e}')
+        start = time.perf_counter()
+        total = sum(view.balance for view in records)
+        print(f'Scanning {n} records: {time.perf_counter() - start:.2f}s, total {total}')
+        # Opened again, the view class is not compiled again.
+        again = open_records(path, layout, writable=False)
+        print(f'Shared view class: {type(again[0]) is type(records[0])}')
+        del records, again
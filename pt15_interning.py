@@ -0,0 +1,108 @@
+import sys
+from array import array
+
+from pt6_boost2 import AccountBase, Descriptor, PosFloat, String
+
+# Some fields hardly ever change value: `currency` takes a few dozen values across
+# millions of accounts. Yet every instance holds its own copy of 'USD', and every assignment
+# runs the very same `isinstance` over and over.
+#
+# A flyweight fixes the copies. The descriptor keeps a table of the values it stored so far:
+#   - a value found in the table is replaced by the canonical object, one 'USD' for all;
+#   - anything else gets admitted while the table has room.
+# The table also numbers the values, so a column can hold small integer codes instead.
+#
+# It does not fix the checks. Skipping them for known values was tried: a table lookup
+# costs more than the `isinstance` it saves, assignments got slower. So the checks run as
+# usual, and the lookup happens in `statement__admit__`: when records are created, or
+# updated in bulk with `update_field`, where copies pile up. Never for values that are only
+# validated, and not for single assignments either, they stay as fast as a plain `String`.
+# The win is memory, one object per distinct value, and the codes, not speed.
+class Interned(Descriptor):
+    maxsize = 1024
+
+    def __init__(self, name=None, maxsize=None):
+        super().__init__(name)
+        if maxsize is not None:
+            self.maxsize = maxsize
+        self.table = {}
+        self.values = []
+        self.codes = {}
+
+    @staticmethod
+    def statement__admit__():
+        # Equal is not enough, 1 == 1.0 == True, the type has to match too.
+        # `get` rather than `[]`, a miss raising KeyError costs more than the lookup.
+        return (
+            'try:',
+            '    _interned = self.table.get(value)',
+            'except TypeError:',
+            '    _interned = value',
+            'if _interned is None:',
+            '    value = self.admit(value)',
+            'elif _interned.__class__ is value.__class__:',
+            '    value = _interned',
+        )
+
+    def admit(self, value):
+        """Adds an accepted value to the table, returns the canonical object"""
+        if len(self.values) >= self.maxsize:
+            return value
+        try:
+            if type(value) is str:
+                value = sys.intern(value)
+            self.table[value] = value
+        except TypeError:
+            return value
+        self.codes[value] = len(self.values)
+        self.values.append(value)
+        return value
+
+    def encode(self, value):
+        """Small integer code of an admitted value, KeyError for any other"""
+        return self.codes[value]
+
+    def decode(self, code):
+        return self.values[code]
+
+    def encode_many(self, values, typecode='H'):
+        """Packs a column of admitted values as codes, 2 bytes each by default.
+        Raises KeyError like `encode` for values never admitted.
+        """
+        return array(typecode, map(self.codes.__getitem__, values))
+
+
+class InternedString(Interned, String):
+    pass
+
+
+if __name__ == '__main__':
+    import timeit
+    import tracemalloc
+    from pt6_boost2 import Account
+
+    class Account2(AccountBase):
+        name = String()
+        currency = InternedString(maxsize=64)
+        balance = PosFloat()
+
+    currencies = ['USD', 'EUR', 'GBP', 'JPY', 'CNY']
+    rows = [(f'Fred Fuches {i}', currencies[i % 5], i * 0.5) for i in range(200000)]
+
+    for cls in (Account, Account2):
+        tracemalloc.start()
+        # Fresh str objects for every row, like a parser would hand them out.
+        accounts = [cls(name, currency.encode().decode(), balance) for name, currency, balance in rows]
+        memory = tracemalloc.get_traced_memory()[0] / len(accounts)
+        tracemalloc.stop()
+        distinct = len({id(a.currency) for a in accounts})
+        del accounts
+
+        create = min(timeit.repeat(lambda: [cls(*row) for row in rows[:50000]], number=1, repeat=5))
+        a = cls('Fred Fuches', 'USD', 0.5)
+        assign = min(timeit.repeat("a.currency = 'EUR'", globals=globals(), number=200000, repeat=5))
+        print(f'{cls.__name__}: {distinct} distinct currency objects, {memory:.0f} bytes a record, '
+              f'50k creations {create:.3f}s, 200k assignments {assign:.3f}s')
+
+    codes = Account2.__dict__['currency'].encode_many(['USD', 'EUR', 'USD'])
+    print(f'currency codes: {codes}, {codes.itemsize} bytes each')
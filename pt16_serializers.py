@@ -0,0 +1,169 @@
+from pt6_boost2 import AccountBase, AccountMeta, build_from_values, define
+from pt14_records import Layout
+
+# Shipping records over the wire usually starts with something like
+#
+#   {name: getattr(account, name) for name in account._fields}
+#
+# a loop, a getattr and a dict insert per field, per record. But we know the fields when the
+# class is created, the same way `make_init` did, so we can spell the loops out:
+#
+#   def to_tuple(self):
+#       return (self.name, self.currency, self.balance)
+#
+# Same idea for dicts, for `from_tuple`, which may skip validation when the data is
+# trusted, and for a compact binary form with `struct`, using the layout of pt14.
+# Locals are named `_0`, `_1`, ... so field names never clash with anything.
+
+def make_to_tuple(fields):
+    code = 'def to_tuple(self):\n'
+    code += f'    return ({"".join(f"self.{field}, " for field in fields)})\n'
+    return code
+
+
+def make_to_dict(fields):
+    code = 'def to_dict(self):\n'
+    code += f'    return {{{", ".join(f"{field!r}: self.{field}" for field in fields)}}}\n'
+    return code
+
+
+def make_from_tuple():
+    code = 'def from_tuple(cls, values, trusted=False):\n'
+    code += '    if trusted and cls is _cls:\n'
+    code += '        return _from_values(values)\n'
+    code += '    return cls(*values)\n'
+    return code
+
+
+def _encode(i, field, code_):
+    # Text fields are fixed width, struct would silently truncate, so check.
+    width = code_[:-1]
+    return (f"    _{i} = self.{field}.encode('utf-8')\n"
+            f"    if len(_{i}) > {width}:\n"
+            f"        raise ValueError('{field} does not fit in {width} bytes')\n")
+
+
+def make_pack(layout):
+    code = 'def pack(self):\n'
+    args = []
+    for i, (field, code_) in enumerate(zip(layout.fields, layout.codes)):
+        if code_.endswith('s'):
+            code += _encode(i, field, code_)
+            args.append(f'_{i}')
+        else:
+            args.append(f'self.{field}')
+    code += f'    return _struct.pack({", ".join(args)})\n'
+    return code
+
+
+def _decoded(layout):
+    return ', '.join(f"_{i}.rstrip(b'\\0').decode('utf-8')" if code_.endswith('s') else f'_{i}'
+                     for i, code_ in enumerate(layout.codes))
+
+
+def make_unpack(layout):
+    names = ', '.join(f'_{i}' for i in range(len(layout.fields)))
+    code = 'def unpack(cls, data, trusted=False):\n'
+    code += f'    {names}, = _struct.unpack(data)\n'
+    code += f'    return cls.from_tuple(({_decoded(layout)},), trusted)\n'
+    return code
+
+
+def make_pack_many(layout):
+    code = 'def pack_many(cls, instances):\n'
+    code += '    buf = bytearray(len(instances) * _struct.size)\n'
+    code += '    offset = 0\n'
+    code += '    for self in instances:\n'
+    args = []
+    for i, (field, code_) in enumerate(zip(layout.fields, layout.codes)):
+        if code_.endswith('s'):
+            code += ''.join('    ' + line + '\n' for line in _encode(i, field, code_).splitlines())
+            args.append(f'_{i}')
+        else:
+            args.append(f'self.{field}')
+    code += f'        _struct.pack_into(buf, offset, {", ".join(args)})\n'
+    code += '        offset += _struct.size\n'
+    code += '    return bytes(buf)\n'
+    return code
+
+
+def make_unpack_many(layout):
+    names = ', '.join(f'_{i}' for i in range(len(layout.fields)))
+    code = 'def unpack_many(cls, data, trusted=False):\n'
+    code += '    build = _from_values if trusted and cls is _cls else lambda values: cls(*values)\n'
+    code += f'    return [build(({_decoded(layout)},)) for {names} in _struct.iter_unpack(data)]\n'
+    return code
+
+
+class SerialMeta(AccountMeta):
+    """`AccountMeta` generating `to_tuple`, `to_dict`, `from_tuple`, `pack`, `unpack` & co.
+
+    `widths` sets the byte width of text fields in the binary form, see `pt14_records.Layout`.
+    Classes with fields that have no binary form only get the tuple and dict conversions.
+    """
+    def __new__(mcs, name, bases, namespace, widths=None, **kwargs):
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        if not cls._fields:
+            return cls
+        fields = cls._fields
+        try:
+            layout = Layout(cls, widths)
+        except TypeError:
+            layout = None
+        env = {'_cls': cls, '_from_values': build_from_values(cls)}
+        methods = {
+            'to_tuple': make_to_tuple(fields),
+            'to_dict': make_to_dict(fields),
+            'from_tuple': make_from_tuple(),
+        }
+        if layout is not None:
+            env['_struct'] = layout.struct
+            methods.update({
+                'pack': make_pack(layout),
+                'unpack': make_unpack(layout),
+                'pack_many': make_pack_many(layout),
+                'unpack_many': make_unpack_many(layout),
+            })
+        for method, code in methods.items():
+            func = define(cls, method, code, dict(env))
+            if method in ('from_tuple', 'unpack', 'pack_many', 'unpack_many'):
+                func = classmethod(func)
+            setattr(cls, method, func)
+        cls._layout = layout
+        return cls
+
+
+class SerialBase(AccountBase, metaclass=SerialMeta):
+    __slots__ = ()
+
+
+if __name__ == '__main__':
+    import json
+    import pickle
+    import time
+    from pt6_boost2 import PosFloat, String
+
+    class Account(SerialBase, widths={'name': 24, 'currency': 3}):
+        name = String()
+        currency = String()
+        balance = PosFloat()
+
+    accounts = [Account(f'Fred Fuches {i}', 'USD', i * 0.5) for i in range(100000)]
+
+    def measure(label, dump, load):
+        start = time.perf_counter()
+        data = dump(accounts)
+        dumped = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = load(data)
+        elapsed = time.perf_counter() - start
+        assert loaded[-1].to_tuple() == accounts[-1].to_tuple()
+        print(f'{label:24} dump {dumped:.3f}s  load {elapsed:.3f}s  {len(data) / len(accounts):.0f} bytes/record')
+
+    measure('pickle', pickle.dumps, pickle.loads)
+    measure('json + to_dict', lambda a: json.dumps([x.to_dict() for x in a]),
+            lambda d: [Account(**x) for x in json.loads(d)])
+    measure('json + to_tuple', lambda a: json.dumps([x.to_tuple() for x in a]),
+            lambda d: [Account.from_tuple(x) for x in json.loads(d)])
+    measure('pack_many', Account.pack_many, Account.unpack_many)
+    measure('pack_many, trusted', Account.pack_many, lambda d: Account.unpack_many(d, trusted=True))
@@ -0,0 +1,148 @@
+from bisect import bisect_left, insort
+from weakref import WeakSet
+
+from pt6_boost2 import AccountBase, Descriptor, variant
+
+# Looking accounts up by currency means a scan over every account, every time:
+#
+#   [a for a in accounts if a.currency == 'USD']
+#
+# A collection can keep indexes instead: a dict per hashed field, value -> accounts, and a
+# sorted list per numeric field for range queries. The catch is keeping them up to date,
+# `a.currency = 'EUR'` goes straight through the descriptor, the collection never hears of it.
+#
+# Unless the descriptor tells it. The `Observed` flavor appends a notification to the store
+# statements, so the generated `__set__` reports every write to the collections watching it.
+# The collection is what adds the flavor, on the descriptors it indexes, so unwatched
+# classes keep their `__set__` as is. The generated `__init__` is left alone too, a brand
+# new instance can't be in any collection yet.
+
+class Observed(Descriptor):
+    watchers = ()
+
+    @classmethod
+    def statement__store__(cls):
+        return tuple(super().statement__store__()) + (
+            'for _watcher in self.watchers:',
+            '    _watcher.changed(instance, self.name, value)',
+        )
+
+
+def observe(descriptor, watcher):
+    """Switches `descriptor` to the `Observed` flavor, `watcher.changed` is called on writes"""
+    if not isinstance(descriptor, Observed):
+        descriptor.__class__ = variant(Observed, type(descriptor))
+    if not isinstance(descriptor.watchers, WeakSet):
+        descriptor.watchers = WeakSet()
+    descriptor.watchers.add(watcher)
+
+
+# Instances are tracked by `id`, the collection holds a reference so ids can't be reused,
+# and instances don't need to be hashable or comparable. Each instance's indexed values are
+# remembered too, to find the old entries once the descriptor has overwritten them.
+class IndexedCollection:
+    """Instances of an `AccountBase` subclass, with hash indexes on `hashed` fields and
+    sorted indexes on numeric `ordered` fields. Indexes follow field assignments."""
+    def __init__(self, cls, instances=(), hashed=(), ordered=()):
+        if not issubclass(cls, AccountBase):
+            raise TypeError('Expected an AccountBase subclass')
+        for field in ordered:
+            if getattr(getattr(cls, field), 'expected', None) not in (int, float):
+                raise TypeError(f'Field {field!r} is not numeric, it cannot be ordered')
+        self.cls = cls
+        self.hashed = {field: {} for field in hashed}
+        self.ordered = {field: [] for field in ordered}
+        self._members = {}
+        self._values = {}
+        for field in {*hashed, *ordered}:
+            observe(getattr(cls, field), self)
+        for instance in instances:
+            self.add(instance)
+
+    def add(self, instance):
+        if not isinstance(instance, self.cls):
+            raise TypeError(f'Expected a {self.cls.__name__}')
+        key = id(instance)
+        if key in self._members:
+            return
+        self._members[key] = instance
+        self._values[key] = values = {}
+        for field in (*self.hashed, *self.ordered):
+            values[field] = value = getattr(instance, field)
+            self._insert(field, key, value)
+
+    def remove(self, instance):
+        key = id(instance)
+        if key not in self._members:
+            raise KeyError(instance)
+        for field, value in self._values.pop(key).items():
+            self._delete(field, key, value)
+        del self._members[key]
+
+    def _insert(self, field, key, value):
+        if field in self.hashed:
+            self.hashed[field].setdefault(value, {})[key] = self._members[key]
+        if field in self.ordered:
+            insort(self.ordered[field], (value, key))
+
+    def _delete(self, field, key, value):
+        if field in self.hashed:
+            bucket = self.hashed[field][value]
+            del bucket[key]
+            if not bucket:
+                del self.hashed[field][value]
+        if field in self.ordered:
+            entries = self.ordered[field]
+            del entries[bisect_left(entries, (value, key))]
+
+    def changed(self, instance, field, value):
+        """Called by the descriptors, after `value` was stored"""
+        key = id(instance)
+        values = self._values.get(key)
+        if values is None or field not in values:
+            return
+        self._delete(field, key, values[field])
+        values[field] = value
+        self._insert(field, key, value)
+
+    def lookup(self, field, value):
+        """Instances whose `field` equals `value`, O(1)"""
+        return list(self.hashed[field].get(value, {}).values())
+
+    def range(self, field, lo=None, hi=None):
+        """Instances with lo <= `field` < hi, ordered by `field`, O(log n) plus the matches"""
+        entries = self.ordered[field]
+        start = 0 if lo is None else bisect_left(entries, (lo,))
+        stop = len(entries) if hi is None else bisect_left(entries, (hi,))
+        members = self._members
+        return [members[key] for _, key in entries[start:stop]]
+
+    def __len__(self):
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(list(self._members.values()))
+
+    def __contains__(self, instance):
+        return id(instance) in self._members
+
+
+if __name__ == '__main__':
+    import timeit
+    from pt6_boost2 import Account
+
+    currencies = ['USD', 'EUR', 'GBP', 'JPY', 'CNY']
+    accounts = [Account(f'Fred Fuches {i}', currencies[i % 5], i * 0.5) for i in range(200000)]
+    collection = IndexedCollection(Account, accounts, hashed=('name', 'currency'), ordered=('balance',))
+
+    scan = timeit.timeit(lambda: [a for a in accounts if a.name == 'Fred Fuches 4242'], number=10)
+    index = timeit.timeit(lambda: collection.lookup('name', 'Fred Fuches 4242'), number=10)
+    print(f'name lookup, scan vs index: {scan / 10:.6f}s vs {index / 10:.6f}s')
+
+    scan = timeit.timeit(lambda: [a for a in accounts if 100 <= a.balance < 110], number=10)
+    index = timeit.timeit(lambda: collection.range('balance', 100, 110), number=10)
+    print(f'balance range, scan vs index: {scan / 10:.6f}s vs {index / 10:.6f}s')
+
+    fred = collection.lookup('name', 'Fred Fuches 42')[0]
+    fred.currency, fred.balance = 'CHF', 1e9
+    print(collection.lookup('currency', 'CHF'), collection.range('balance', 1e8))
@@ -0,0 +1,235 @@
+import time
+import weakref
+from collections import OrderedDict
+from functools import wraps
+
+from pt2_debug_metacls_approach import DebugMeta
+from pt6_boost2 import Descriptor
+from pt17_indexed import observe
+
+# Pricing code computes the same fee for the same account over and over. `functools.lru_cache`
+# does not really fit methods: one cache for the whole program, instances kept alive
+# by it, and nothing tells it that `account.balance` just changed.
+#
+# Same vehicle as `debugmethod`: `memoizemethods` wraps the methods of a class marked with
+# `@pure`, `MemoMeta` does it for a whole hierarchy. Each method gets its own `MethodCache`:
+#   - LRU bounded by `maxsize`, entries optionally expiring after `ttl` seconds;
+#   - keyed on the arguments, `self` included, held weakly with `weak=True` (instances
+#     that can't be referenced weakly, slotted ones, are then not cached at all);
+#   - hits, misses and evictions counted;
+#   - dropped for an instance as soon as one of its descriptor fields is assigned,
+#     with the `Observed` descriptors of pt17.
+
+_KWARGS = object()
+
+
+class MethodCache:
+    def __init__(self, maxsize=128, ttl=None, weak=False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.weak = weak
+        self.entries = OrderedDict()
+        # owner (instance, or weak reference to it) -> keys of its entries
+        self.owners = {}
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def owner(self, instance):
+        return weakref.ref(instance) if self.weak else instance
+
+    def store(self, key, value, instance=None):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        if instance is not None:
+            owner = self.owner(instance)
+            if owner not in self.owners:
+                # The reference stored is the one with the callback, entries use it too.
+                if self.weak:
+                    owner = weakref.ref(instance, self.forget)
+                self.owners[owner] = (owner, set())
+            owner, keys = self.owners[owner]
+            key = (owner,) + key[1:]
+            keys.add(key)
+        self.entries[key] = (value, expires)
+        while len(self.entries) > self.maxsize:
+            self.discard(next(iter(self.entries)))
+            self.evictions += 1
+
+    def discard(self, key):
+        del self.entries[key]
+        if key and key[0] in self.owners:
+            owner, keys = self.owners[key[0]]
+            keys.discard(key)
+            if not keys:
+                del self.owners[owner]
+
+    def forget(self, ref):
+        _, keys = self.owners.pop(ref, (None, ()))
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def invalidate(self, instance):
+        """Drops every entry computed for `instance`"""
+        try:
+            _, keys = self.owners.pop(self.owner(instance), (None, ()))
+        except TypeError:
+            return
+        for key in keys:
+            self.entries.pop(key, None)
+        self.invalidations += len(keys)
+
+    def clear(self):
+        self.entries.clear()
+        self.owners.clear()
+
+    def snapshot(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': len(self.entries),
+        }
+
+
+def memoize(func, cache, method):
+    """Wraps `func` with `cache`, `method` if the first argument is an instance to track"""
+    entries = cache.entries
+    weak = method and cache.weak
+    now = time.monotonic
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = args + (_KWARGS,) + tuple(sorted(kwargs.items())) if kwargs else args
+        if weak:
+            try:
+                key = (weakref.ref(args[0]),) + key[1:]
+            except TypeError:
+                # No `__weakref__`, e.g. slotted records: no caching rather than leaking.
+                return func(*args, **kwargs)
+        try:
+            value, expires = entries[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable arguments, nothing to cache.
+            return func(*args, **kwargs)
+        else:
+            if expires is None or expires > now():
+                entries.move_to_end(key)
+                cache.hits += 1
+                return value
+            cache.discard(key)
+            cache.evictions += 1
+        cache.misses += 1
+        value = func(*args, **kwargs)
+        cache.store(key, value, args[0] if method else None)
+        return value
+    wrapper.cache = cache
+    return wrapper
+
+
+def pure(func=None, *, maxsize=128, ttl=None, weak=False):
+    """Marks a method for `memoizemethods`, as `@pure` or `@pure(maxsize=..., ttl=..., weak=...)`"""
+    def mark(func):
+        func.__memoize__ = {'maxsize': maxsize, 'ttl': ttl, 'weak': weak}
+        return func
+    return mark if func is None else mark(func)
+
+
+# Both keyed by class, two classes may well share a qualname (same name, other module).
+# class -> {qualname: cache} of every cache, for `stats` and `clear`
+_caches = weakref.WeakKeyDictionary()
+# class -> caches of its instance methods, for `invalidate`
+_by_class = weakref.WeakKeyDictionary()
+
+
+class _Invalidator:
+    # Watches descriptors, see `pt17_indexed.observe`.
+    def changed(self, instance, field, value):
+        invalidate(instance)
+
+
+_invalidator = _Invalidator()
+
+
+def memoizemethods(cls):
+    # Like `profilemethods`, classmethods and staticmethods are unwrapped and wrapped back.
+    # Their caches are not tied to instances, only instance methods get invalidated.
+    caches = []
+    named = _caches.setdefault(cls, {})
+    for name, val in list(vars(cls).items()):
+        if isinstance(val, (classmethod, staticmethod)):
+            options = getattr(val.__func__, '__memoize__', None)
+            if options:
+                cache = named[val.__func__.__qualname__] = MethodCache(**options)
+                setattr(cls, name, type(val)(memoize(val.__func__, cache, method=False)))
+        elif callable(val) and not isinstance(val, type) and hasattr(val, '__memoize__'):
+            cache = named[val.__qualname__] = MethodCache(**val.__memoize__)
+            setattr(cls, name, memoize(val, cache, method=True))
+            caches.append(cache)
+    _by_class[cls] = caches
+    if any(_by_class.get(base) for base in cls.__mro__):
+        # Inherited fields too, a method may well read a field of a base class.
+        for base in cls.__mro__:
+            for val in vars(base).values():
+                if isinstance(val, Descriptor):
+                    observe(val, _invalidator)
+    return cls
+
+
+class MemoMeta(DebugMeta):
+    decorate = staticmethod(memoizemethods)
+
+
+def invalidate(instance):
+    """Drops everything memoized for `instance`"""
+    for cls in type(instance).__mro__:
+        for cache in _by_class.get(cls, ()):
+            cache.invalidate(instance)
+
+
+def stats():
+    """{(class, qualname): {'hits', 'misses', 'evictions', 'invalidations', 'size'}} of every cache"""
+    return {(cls, qualname): cache.snapshot()
+            for cls, named in list(_caches.items()) for qualname, cache in named.items()}
+
+
+def clear():
+    for named in list(_caches.values()):
+        for cache in named.values():
+            cache.clear()
+
+
+if __name__ == '__main__':
+    import timeit
+    from pt6_boost2 import AccountBase, PosFloat, String
+
+    # `AccountBase` classes have a metaclass already, the decorator does the job.
+    @memoizemethods
+    class Pricing(AccountBase):
+        name = String()
+        currency = String()
+        balance = PosFloat()
+
+        def fee_slow(self, days):
+            return sum(self.balance * 0.0001 * (1.01 ** d) for d in range(days))
+
+        @pure(maxsize=1024)
+        def fee(self, days):
+            return sum(self.balance * 0.0001 * (1.01 ** d) for d in range(days))
+
+        @staticmethod
+        @pure(ttl=60)
+        def rate(currency):
+            return {'USD': 1.0, 'EUR': 1.1}.get(currency, 0.5)
+
+    p = Pricing('Fred Fuches', 'USD', 1000.0)
+    slow = timeit.timeit(lambda: p.fee_slow(30), number=100000)
+    fast = timeit.timeit(lambda: p.fee(30), number=100000)
+    print(f'100k fee computations, plain vs memoized: {slow:.3f}s vs {fast:.3f}s')
+
+    before = p.fee(30)
+    p.balance = 2000.0
+    print(f'fee before and after a balance change: {before:.4f} -> {p.fee(30):.4f}')
+    Pricing.rate('EUR'), Pricing.rate('EUR')
+    for (cls, qualname), s in stats().items():
+        print(qualname, s)
@@ -1,3 +1,4 @@
+import inspect
 from functools import wraps
 
 def do_stuff(*args, **kwargs):
@@ -31,10 +32,25 @@ print(do_stuff_v2)
 
 def betterdebug(func):
     msg = func.__qualname__
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        print(msg)
-        return func(*args, **kwargs)
+    # Calling an `async def` only creates the coroutine, nothing runs until it's awaited.
+    # So the wrapper of a coroutine function must be one too, and await the real thing,
+    # and the wrapper of an async generator function must iterate it.
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            print(msg)
+            return await func(*args, **kwargs)
+    elif inspect.isasyncgenfunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            print(msg)
+            async for item in func(*args, **kwargs):
+                yield item
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            print(msg)
+            return func(*args, **kwargs)
     return wrapper
 
 @betterdebug
@@ -0,0 +1,250 @@
+import inspect
+import itertools
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+
+from pt2_debug_metacls_approach import DebugMeta
+
+# A plain wrapper around an `async def` returns as soon as `func(*args)` does. That is,
+# as soon as the coroutine object is *created*: nothing ran yet. An async generator is
+# even worse, it's not even started. That's why `betterdebug`, and the profilers of pt9
+# and pt10, switch to an async wrapper for those, awaiting or iterating the real thing.
+#
+# That gives the wall time, awaits included, but for a service we'd like more:
+#   - time spent suspended, waiting on the event loop, vs time actually running;
+#   - how many calls of a method are in flight at once;
+#   - which call happened inside which, a span id per call, in a `ContextVar` so that
+#     concurrent tasks never mix them up.
+#
+# Suspended time needs to see every suspension. `_Measured` is an awaitable driving the
+# coroutine step by step, like the event loop would, timing each `send`. Whatever is
+# not spent in a step was spent suspended.
+
+class _Measured:
+    __slots__ = ('awaitable', 'running')
+
+    def __init__(self, awaitable):
+        self.awaitable = awaitable
+        self.running = 0
+
+    def __await__(self):
+        steps = self.awaitable.__await__()
+        now = time.perf_counter_ns
+        value = exc = None
+        while True:
+            start = now()
+            try:
+                yielded = steps.send(value) if exc is None else steps.throw(exc)
+            except StopIteration as stop:
+                self.running += now() - start
+                return stop.value
+            except BaseException:
+                self.running += now() - start
+                raise
+            self.running += now() - start
+            try:
+                value, exc = (yield yielded), None
+            except GeneratorExit:
+                steps.close()
+                raise
+            except BaseException as e:
+                value, exc = None, e
+
+
+class AsyncStats:
+    __slots__ = ('count', 'wall_ns', 'running_ns', 'in_flight', 'peak')
+
+    def __init__(self):
+        self.count = self.wall_ns = self.running_ns = self.in_flight = self.peak = 0
+
+    def enter(self):
+        self.in_flight += 1
+        if self.in_flight > self.peak:
+            self.peak = self.in_flight
+
+    def exit(self, wall, running):
+        self.in_flight -= 1
+        self.count += 1
+        self.wall_ns += wall
+        self.running_ns += running
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'wall_ns': self.wall_ns,
+            'running_ns': self.running_ns,
+            'suspended_ns': self.wall_ns - self.running_ns,
+            'in_flight': self.in_flight,
+            'peak': self.peak,
+        }
+
+
+_span = ContextVar('span', default=None)
+_ids = itertools.count(1)
+_stats = {}
+
+# (qualname, span, parent span, start ns, wall ns, suspended ns), most recent last.
+spans = deque(maxlen=10000)
+
+
+def current_span():
+    """Span id of the timed call running in this context, None outside of any"""
+    return _span.get()
+
+
+def _coroutine(func, stats):
+    qualname = func.__qualname__
+    now = time.perf_counter_ns
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        parent, span = _span.get(), next(_ids)
+        token = _span.set(span)
+        stats.enter()
+        start = now()
+        measured = _Measured(func(*args, **kwargs))
+        try:
+            return await measured
+        finally:
+            wall = now() - start
+            stats.exit(wall, measured.running)
+            spans.append((qualname, span, parent, start, wall, wall - measured.running))
+            _span.reset(token)
+    return wrapper
+
+
+# An async generator runs a step at a time, in the context of whoever iterates it, and
+# may be consumed by another task later on. So the span is set around each step only,
+# and only the steps are timed, not whatever the consumer does in between.
+def _asyncgen(func, stats):
+    qualname = func.__qualname__
+    now = time.perf_counter_ns
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        parent, span = _span.get(), next(_ids)
+        stats.enter()
+        start = now()
+        agen = func(*args, **kwargs)
+        wall = running = 0
+        value = exc = None
+        try:
+            while True:
+                measured = _Measured(agen.asend(value) if exc is None else agen.athrow(exc))
+                token = _span.set(span)
+                step = now()
+                try:
+                    item = await measured
+                except StopAsyncIteration:
+                    return
+                finally:
+                    wall += now() - step
+                    running += measured.running
+                    _span.reset(token)
+                try:
+                    value, exc = (yield item), None
+                except GeneratorExit:
+                    raise
+                except BaseException as e:
+                    value, exc = None, e
+        finally:
+            token = _span.set(span)
+            try:
+                await agen.aclose()
+            finally:
+                _span.reset(token)
+            stats.exit(wall, running)
+            spans.append((qualname, span, parent, start, wall, wall - running))
+    return wrapper
+
+
+def _function(func, stats):
+    qualname = func.__qualname__
+    now = time.perf_counter_ns
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        parent, span = _span.get(), next(_ids)
+        token = _span.set(span)
+        stats.enter()
+        start = now()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            wall = now() - start
+            stats.exit(wall, wall)
+            spans.append((qualname, span, parent, start, wall, 0))
+            _span.reset(token)
+    return wrapper
+
+
+def timed(func):
+    """Times `func`, plain function, coroutine function or async generator function alike"""
+    stats = _stats.setdefault(func.__qualname__, AsyncStats())
+    if inspect.iscoroutinefunction(func):
+        return _coroutine(func, stats)
+    if inspect.isasyncgenfunction(func):
+        return _asyncgen(func, stats)
+    return _function(func, stats)
+
+
+def timemethods(cls):
+    # Same walk as `profilemethods`.
+    for name, val in list(vars(cls).items()):
+        if isinstance(val, (classmethod, staticmethod)):
+            setattr(cls, name, type(val)(timed(val.__func__)))
+        elif callable(val) and not isinstance(val, type):
+            setattr(cls, name, timed(val))
+    return cls
+
+
+class AsyncTimeMeta(DebugMeta):
+    decorate = staticmethod(timemethods)
+
+
+def snapshot():
+    """{qualname: {'count', 'wall_ns', 'running_ns', 'suspended_ns', 'in_flight', 'peak'}}"""
+    return {qualname: stats.snapshot() for qualname, stats in _stats.items()}
+
+
+def reset():
+    for stats in _stats.values():
+        stats.count = stats.wall_ns = stats.running_ns = 0
+        stats.peak = stats.in_flight
+    spans.clear()
+
+
+if __name__ == '__main__':
+    import asyncio
+
+    class Service(metaclass=AsyncTimeMeta):
+        async def fetch(self, n):
+            await asyncio.sleep(0.01)
+            return self.parse(n)
+
+        def parse(self, n):
+            return sum(range(n))
+
+        async def stream(self, count):
+            for i in range(count):
+                await asyncio.sleep(0.001)
+                yield await self.fetch(i)
+
+        @classmethod
+        async def create(cls):
+            await asyncio.sleep(0)
+            return cls()
+
+    async def main():
+        service = await Service.create()
+        await asyncio.gather(*(service.fetch(10000) for _ in range(100)))
+        return [item async for item in service.stream(5)]
+
+    print(asyncio.run(main()))
+    for qualname, s in snapshot().items():
+        print(f"{qualname:16} calls {s['count']:>4}  wall {s['wall_ns'] / 1e6:8.2f}ms  "
+              f"suspended {s['suspended_ns'] / 1e6:8.2f}ms  peak in flight {s['peak']}")
+    qualname, span, parent, *_ = spans[-2]
+    print(f'{qualname} span {span} ran inside span {parent}: {[s[0] for s in spans if s[1] == parent]}')
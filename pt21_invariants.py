@@ -0,0 +1,175 @@
+import inspect
+
+from pt6_boost2 import (AccountBase, AccountMeta, Descriptor, RESERVED, build_from_values, define,
+                        make_fused_init, variant)
+
+# Descriptors check one field at a time. "The balance stays below the limit of its currency"
+# involves two, so it ends up in a hand-written `__init__`, and there goes the generated one.
+#
+# Let's declare such rules as functions instead, the parameters name the fields they need:
+#
+#   @invariant
+#   def within_limit(currency, balance):
+#       return balance <= LIMITS[currency]
+#
+# The parameter names are all the dependency tracking we need:
+#   - `__init__` calls every invariant once, after all the stores, on its own arguments;
+#   - assigning a field only calls the invariants naming it, from a guard generated per
+#     field, before the store: a rejected value is never written;
+#   - `update_field` and `set_many` run the guards over the batch before writing anything,
+#     and `check_invariants(instances)` checks instances built without `__init__`;
+#     `check_records` does the same for field tuples, for the bulk paths of pt7, pt11,
+#     pt12 and pt14.
+
+class InvariantError(ValueError):
+    def __init__(self, name, values):
+        self.name = name
+        self.values = values
+        super().__init__(f'Invariant {name} does not hold for {values}')
+
+
+class Invariant:
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.fields = tuple(inspect.signature(func).parameters)
+
+
+def invariant(func):
+    """Declares a class level rule over the fields named by the parameters of `func`"""
+    return Invariant(func)
+
+
+# The guard flavor, for the fields some invariant depends on. `guard` is generated per field.
+class Guarded(Descriptor):
+    guard = None
+
+    @staticmethod
+    def statement__guard__():
+        return ('self.guard(instance, value)',)
+
+
+CONSTRAINED = ('_invariants', '_error', '_instances', '_index', '_failures', '_exc')
+
+
+def make_checks(invariants, argument, indent='    '):
+    code = ''
+    for i, inv in enumerate(invariants):
+        args = ', '.join(argument(field) for field in inv.fields)
+        code += f'{indent}if not _invariants[{i}]({args}):\n'
+        code += f'{indent}    raise _error({inv.name!r}, ({args},))\n'
+    return code
+
+
+def make_guard(field, invariants):
+    code = 'def guard(instance, value):\n'
+    code += make_checks(invariants, lambda name: 'value' if name == field else f'instance.{name}')
+    return code
+
+
+def make_check_invariants(invariants):
+    needed = list(dict.fromkeys(field for inv in invariants for field in inv.fields))
+    code = 'def check_invariants(_instances):\n'
+    code += '    _failures = []\n'
+    code += '    for _index, instance in enumerate(_instances):\n'
+    code += '        try:\n'
+    code += f'            {", ".join(needed)}, = {", ".join(f"instance.{f}" for f in needed)},\n'
+    code += make_checks(invariants, lambda name: name, indent='            ')
+    code += '        except (TypeError, ValueError) as _exc:\n'
+    code += '            _failures.append((_index, _exc))\n'
+    code += '    return _failures\n'
+    return code
+
+
+class ConstrainedMeta(AccountMeta):
+    """`AccountMeta` compiling the `@invariant` rules of a class into its generated code"""
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        fields = [key for key, v in namespace.items() if isinstance(v, Descriptor)]
+        invariants = [namespace.pop(key) for key, v in list(namespace.items()) if isinstance(v, Invariant)]
+        for inv in invariants:
+            unknown = set(inv.fields) - set(fields)
+            if unknown:
+                raise TypeError(f'Invariant {inv.name} depends on unknown fields {sorted(unknown)}')
+        namespace['_invariants'] = tuple(invariants)
+        new_cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        if invariants:
+            env = {'_invariants': tuple(inv.func for inv in invariants), '_error': InvariantError}
+            for field in fields:
+                touching = [inv for inv in invariants if field in inv.fields]
+                if touching:
+                    # After `__init__` was generated, it checks everything once, at the end.
+                    descriptor = new_cls.__dict__[field]
+                    descriptor.guard = define(new_cls, 'guard', make_guard(field, touching),
+                                              dict(env, _invariants=tuple(inv.func for inv in touching)))
+                    descriptor.__class__ = variant(Guarded, type(descriptor))
+            new_cls.check_invariants = staticmethod(
+                define(new_cls, 'check_invariants', make_check_invariants(invariants), dict(env)))
+        return new_cls
+
+    def generate_init(cls, fields, descriptors):
+        invariants = cls.__dict__['_invariants']
+        if not invariants:
+            return super().generate_init(fields, descriptors)
+        if set(fields) & set(RESERVED + CONSTRAINED):
+            raise TypeError(f'Fields named {RESERVED + CONSTRAINED} cannot be constrained')
+        env = {
+            '_descriptors': tuple(descriptors),
+            '_invariants': tuple(inv.func for inv in invariants),
+            '_error': InvariantError,
+        }
+        code = make_fused_init(fields, descriptors, env)
+        code += make_checks(invariants, lambda name: name)
+        return define(cls, '__init__', code, env)
+
+
+def check_records(cls, records):
+    """[(index, exception)] of the field tuples breaking an invariant of `cls`, if any"""
+    if not getattr(cls, '_invariants', ()):
+        return []
+    # Generated once per class, not per chunk.
+    from_values = cls.__dict__.get('_records_from_values')
+    if from_values is None:
+        from_values = cls._records_from_values = build_from_values(cls)
+    return cls.check_invariants([from_values(values) for values in records])
+
+
+class ConstrainedBase(AccountBase, metaclass=ConstrainedMeta):
+    __slots__ = ()
+
+    @staticmethod
+    def check_invariants(instances):
+        """[(index, exception)] of the instances breaking an invariant"""
+        return []
+
+
+if __name__ == '__main__':
+    import timeit
+    from pt6_boost2 import PosFloat, String, ValidationError
+
+    LIMITS = {'USD': 1000.0, 'EUR': 900.0}
+
+    class Account(ConstrainedBase):
+        name = String()
+        currency = String()
+        balance = PosFloat()
+
+        @invariant
+        def within_limit(currency, balance):
+            return balance <= LIMITS.get(currency, 0.0)
+
+    a = Account('Fred Fuches', 'USD', 950.0)
+    for field, value in (('balance', 2000.0), ('currency', 'EUR')):
+        try:
+            setattr(a, field, value)
+        except InvariantError as e:
+            print(f'{field} = {value!r} rejected: {e}, still {getattr(a, field)!r}')
+
+    accounts = [Account(f'Fred Fuches {i}', 'USD', 10.0) for i in range(5)]
+    try:
+        Account.update_field(accounts, 'balance', [5.0, 5000.0, 5.0, 1e9, 5.0])
+    except ValidationError as e:
+        print(e)
+
+    name = timeit.timeit("a.name = 'Fred'", globals=globals(), number=200000)
+    balance = timeit.timeit('a.balance = 1.0', globals=globals(), number=200000)
+    print(f'Assignment, unconstrained name vs constrained balance: {name:.3f}s vs {balance:.3f}s')
@@ -0,0 +1,128 @@
+from operator import attrgetter
+
+from pt6_boost2 import AccountBase, AccountMeta, Descriptor, define, slot_name
+
+# Accounts as dict keys, or sorted by the million, and `AccountMeta` classes have no
+# `__eq__`, no `__hash__`, no ordering. So it's `key=lambda a: (a.name, a.currency, a.balance)`,
+# a python call and a tuple per record.
+#
+# Records that never change can have all of it, generated from `_fields` as usual:
+#   - `__eq__` and the orderings compare field tuples;
+#   - `__hash__` hashes the field tuple once, and keeps the result in a slot;
+#   - `__reduce__` pickles the field values only, string hashes change from one process
+#     to the next, a cached hash must never travel;
+#   - `sort_key` is an `operator.attrgetter`, C all the way. With `slots=True` it reads
+#     the hidden slots directly, skipping the python `__get__` of `Slotted`.
+# Frozen means frozen: a `statement__guard__` rejects every assignment. Guards only run
+# in `__set__` and `set_many`, the generated `__init__` doesn't even see it.
+
+class Frozen(Descriptor):
+    @staticmethod
+    def statement__guard__():
+        return ('raise AttributeError("%s is frozen" % self.name)',)
+
+
+def make_eq(attrs):
+    fields = lambda owner: ''.join(f'{owner}.{attr}, ' for attr in attrs)
+    code = 'def __eq__(self, other):\n'
+    code += '    if self is other:\n'
+    code += '        return True\n'
+    code += '    if other.__class__ is not self.__class__:\n'
+    code += '        return NotImplemented\n'
+    code += f'    return ({fields("self")}) == ({fields("other")})\n'
+    return code
+
+
+def make_order(name, op, attrs):
+    fields = lambda owner: ''.join(f'{owner}.{attr}, ' for attr in attrs)
+    code = f'def {name}(self, other):\n'
+    code += '    if other.__class__ is not self.__class__:\n'
+    code += '        return NotImplemented\n'
+    code += f'    return ({fields("self")}) {op} ({fields("other")})\n'
+    return code
+
+
+def make_hash(attrs):
+    code = 'def __hash__(self):\n'
+    code += '    try:\n'
+    code += '        return self._hash\n'
+    code += '    except AttributeError:\n'
+    code += f'        self._hash = value = hash(({"".join(f"self.{attr}, " for attr in attrs)}))\n'
+    code += '        return value\n'
+    return code
+
+
+def make_reduce(attrs):
+    code = 'def __reduce__(self):\n'
+    code += f'    return (self.__class__, ({"".join(f"self.{attr}, " for attr in attrs)}))\n'
+    return code
+
+
+ORDERS = (('__lt__', '<'), ('__le__', '<='), ('__gt__', '>'), ('__ge__', '>='))
+
+
+class FrozenMeta(AccountMeta):
+    """`AccountMeta` for immutable, hashable and ordered records"""
+    def __new__(mcs, name, bases, namespace, slots=False, **kwargs):
+        new_cls = super().__new__(mcs, name, bases, namespace, slots=slots, **kwargs)
+        if new_cls._fields:
+            attrs = [slot_name(field) if slots else field for field in new_cls._fields]
+            methods = {'__eq__': make_eq(attrs), '__hash__': make_hash(attrs),
+                       '__reduce__': make_reduce(attrs)}
+            methods.update((op, make_order(op, symbol, attrs)) for op, symbol in ORDERS)
+            for method, code in methods.items():
+                setattr(new_cls, method, define(new_cls, method, code, {}))
+            new_cls.sort_key = attrgetter(*attrs)
+        return new_cls
+
+    def descriptor_mixins(cls, slots):
+        return super().descriptor_mixins(slots) + [Frozen]
+
+
+class FrozenBase(AccountBase, metaclass=FrozenMeta):
+    __slots__ = ('_hash',)
+
+
+if __name__ == '__main__':
+    import random
+    import sys
+    import time
+    from dataclasses import dataclass
+    from pt6_boost2 import Float, String
+
+    class Key(FrozenBase, slots=True):
+        name = String()
+        currency = String()
+        balance = Float()
+
+    @dataclass(frozen=True, order=True)
+    class DataKey:
+        name: str
+        currency: str
+        balance: float
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rows = [(f'Fred Fuches {random.randrange(n)}', random.choice(['USD', 'EUR']), float(i))
+            for i in range(n)]
+
+    def measure(label, records, key=None):
+        table = dict.fromkeys(records)
+        probes = records[::10]
+        start = time.perf_counter()
+        for probe in probes:
+            table[probe]
+        lookup = (time.perf_counter() - start) / len(probes) * 1e9
+        start = time.perf_counter()
+        sorted(records, key=key)
+        print(f'{label:32} lookup {lookup:6.0f}ns  sort {time.perf_counter() - start:.2f}s')
+
+    measure('tuple', rows)
+    measure('dataclass(frozen, order)', [DataKey(*row) for row in rows])
+    keys = [Key(*row) for row in rows]
+    measure('Key, lambda key', keys, key=lambda k: (k.name, k.currency, k.balance))
+    measure('Key, sort_key', keys, key=Key.sort_key)
+
+    try:
+        keys[0].balance = 1.0
+    except AttributeError as e:
+        print(e)
@@ -0,0 +1,65 @@
+from pt6_boost2 import generated_source, profile_statements, statement_stats
+
+# Everything generated so far is registered with `linecache` under a synthetic filename,
+# `<generated __init__ 3f2a...>`, so tracebacks point at real lines:
+#
+#   File "<generated __set__ 8c1d...>", line 5, in __set__
+#       raise ValueError("Expect a positive value")
+#
+# and `generated_source(cls)` dumps the code of a record class and of its descriptors.
+#
+# What tracebacks won't tell is where the time goes inside the fused code. Turn on
+# `profile_statements()` *before* defining classes, and each group of fused statements
+# counts its executions and its time, charged to the class it came from, `Typed`,
+# `Positive`..., per descriptor class, and without what the clock reads cost.
+# Off, generated code is exactly what it always was.
+
+def _descriptor_label(derived):
+    # Specialised classes keep the name of their class, the field tells them apart.
+    name = (getattr(derived, '_constants', None) or {}).get('name')
+    return f'{derived.__qualname__}({name})' if name else derived.__qualname__
+
+
+def report():
+    """Profiled statement groups by total time, as text"""
+    lines = [f'{"descriptor":28} {"contributed by":24} {"count":>10} {"total ms":>10} {"mean ns":>8}']
+    for (derived, d), stats in sorted(statement_stats().items(), key=lambda item: -item[1]['total_ns']):
+        if not stats['count']:
+            continue
+        lines.append(f'{_descriptor_label(derived):28} {d.__qualname__:24} {stats["count"]:>10} '
+                     f'{stats["total_ns"] / 1e6:>10.3f} {stats["mean_ns"]:>8.0f}')
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    import traceback
+    from pt6_boost2 import AccountBase, Float, Positive, String, Typed
+
+    profile_statements(True)
+
+    # Same checks, two orders: which one should go first?
+    class TypedFirst(Float, Positive):
+        pass
+
+    class PositiveFirst(Positive, Float):
+        pass
+
+    class Account(AccountBase):
+        name = String()
+        balance = TypedFirst()
+        limit = PositiveFirst()
+
+    a = Account('Fred Fuches', 1.0, 1.0)
+    for i in range(100000):
+        a.balance = float(i)
+        a.limit = float(i)
+    profile_statements(False)
+    print(report())
+    print()
+
+    try:
+        a.balance = -1.0
+    except ValueError:
+        traceback.print_exc()
+    print()
+    print(generated_source(Account))
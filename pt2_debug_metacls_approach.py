@@ -6,10 +6,15 @@ from pt1_debug_decorator_approach import debugmethod
 
 class DebugMeta(type):
     def __new__(mcs, name, bases, classdict):
-        new_cls = super.__new__(mcs, name, bases, classdict)
-        new_cls = debugmethod(new_cls)
+        new_cls = super().__new__(mcs, name, bases, classdict)
+        new_cls = mcs.decorate(new_cls)
         return new_cls
 
+    # What gets applied to every class of the hierarchy, swap it in a subclass.
+    @staticmethod
+    def decorate(cls):
+        return debugmethod(cls)
+
 # What the fuck is a `type`?
 # Every value in python has a type
 
@@ -74,8 +79,8 @@ c.foo()
 # But why would I use metaclass? Because metaclasses **propagate** down hierarchies, and decorator don't.
 # Let's take a closer loot at `DebugMeta`:
 #  
-# >>> new_cls = super.__new__(mcs, name, bases, classdict)
-# >>> new_cls = debugmethod(new_cls)
+# >>> new_cls = super().__new__(mcs, name, bases, classdict)
+# >>> new_cls = mcs.decorate(new_cls)    # debugmethod(new_cls)
 #
 # A new class get created normally, and get decorated immediately after creation
 class FuckBase(metaclass=DebugMeta):
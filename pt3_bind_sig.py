@@ -43,6 +43,73 @@ def make_signature(names):
         Parameter(name, Parameter.POSITIONAL_OR_KEYWORD) 
         for name in names)
 
+# `Signature.bind` is written in pure python though, and walks the parameters one by one
+# on every single call. The interpreter already knows how to bind arguments,
+# it does it for every function call in C. So let's generate a function with the very
+# signature, once, and let it hand the bound arguments back:
+#
+#   def __init__(name, address, email):
+#       return {'name': name, 'address': address, 'email': email}
+#
+# Missing, duplicate or unexpected arguments raise TypeError, just like `bind` does.
+# Like `bind`, parameters left to their defaults are not part of the result,
+# a sentinel default tells them apart.
+MISSING = '__binder_missing__'
+
+def make_binder_source(sig):
+    params, entries, optional = [], [], []
+    star = False
+    slash = not any(p.kind is Parameter.POSITIONAL_ONLY for p in sig.parameters.values())
+    # The result dict must not shadow a parameter.
+    bound = '_bound'
+    while bound in sig.parameters:
+        bound += '_'
+    for param in sig.parameters.values():
+        # `/` closes the positional-only ones, it always comes before `*`.
+        if param.kind is not Parameter.POSITIONAL_ONLY and not slash:
+            params.append('/')
+            slash = True
+        if param.kind is Parameter.KEYWORD_ONLY and not star:
+            params.append('*')
+            star = True
+        if param.kind is Parameter.VAR_POSITIONAL:
+            params.append(f'*{param.name}')
+            star = True
+            optional.append(param.name)
+        elif param.kind is Parameter.VAR_KEYWORD:
+            params.append(f'**{param.name}')
+            optional.append(param.name)
+        elif param.default is not Parameter.empty:
+            params.append(f'{param.name}={MISSING}')
+            optional.append(param.name)
+        else:
+            params.append(param.name)
+        entries.append(f'{param.name!r}: {param.name}')
+    if not slash:
+        params.append('/')
+
+    code = f'def __init__({", ".join(params)}):\n'
+    code += f'    {bound} = {{{", ".join(entries)}}}\n'
+    for name in optional:
+        if sig.parameters[name].kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
+            code += f'    if not {name}:\n'
+        else:
+            code += f'    if {name} is {MISSING}:\n'
+        code += f'        del {bound}[{name!r}]\n'
+    code += f'    return {bound}\n'
+    return code
+
+_binders = {}
+
+def make_binder(sig):
+    """Compiles `sig` into a function returning what `sig.bind(...).arguments` would"""
+    if sig not in _binders:
+        env = {MISSING: object()}
+        exec(make_binder_source(sig), env)
+        # Two threads may compile the same binder, `setdefault` makes sure both use the first.
+        return _binders.setdefault(sig, env['__init__'])
+    return _binders[sig]
+
 class Signatured:
     _signature = make_signature([])
     def __init__(self, *args, **kwargs):
@@ -80,13 +147,13 @@ class SigMeta(type):
         new_cls = super().__new__(cls, name, bases, namespace)
         sig = make_signature(new_cls._fields)
         setattr(new_cls, '_signature', sig)
+        setattr(new_cls, '_bind', staticmethod(make_binder(sig)))
         return new_cls
 
 class SigBase(metaclass=SigMeta):
     _fields = []
     def __init__(self, *args, **kwargs):
-        bound_sig = self._signature.bind(*args, **kwargs)
-        for name, val in bound_sig.arguments.items():
+        for name, val in self._bind(*args, **kwargs).items():
             setattr(self, name, val)
 
 class Point(SigBase):
@@ -8,9 +8,8 @@
 #   - type checking;
 #   - validation: >, <, ==, etc.
 # You can upgrade attributes to properties:
-import timeit
 from collections import OrderedDict
-from pt3_bind_sig import SigBase, make_signature
+from pt3_bind_sig import SigBase, make_signature, make_binder
 
 class Account(SigBase):
     _fields = ('name', 'currency', 'balance')
@@ -132,17 +131,17 @@ class StructureMeta(type):
 
     def __new__(cls, name, bases, namespace):
         fields = [k for k, v in namespace.items() if isinstance(v, Descriptor)]
-        for name in fields:
-            namespace[name].name = name # equivlent to name = Descriptor(name='name')
+        for field in fields:
+            namespace[field].name = field # equivlent to name = Descriptor(name='name')
         new_cls = super().__new__(cls, name, bases, dict(namespace))
         sig = make_signature(fields)
         setattr(new_cls, '_signature', sig)
+        setattr(new_cls, '_bind', staticmethod(make_binder(sig)))
         return new_cls
 
 class Structure(metaclass=StructureMeta):
     def __init__(self, *args, **kwargs):
-        bound_sig = self._signature.bind(*args, **kwargs)
-        for name, value in bound_sig.arguments.items():
+        for name, value in self._bind(*args, **kwargs).items():
             setattr(self, name, value)
 
 class Account4(Structure):
@@ -169,15 +168,8 @@ sa = SimpleAccount('Fred Fuches', 'USD', 50.9)
 
 
 if __name__ == '__main__':
-    simple = timeit.timeit("a = SimpleAccount('Fred Fuches', 'USD', 50.9)", "from __main__ import SimpleAccount", number=50000)
-    fancy = timeit.timeit("a = Account4('Fred Fuches', 'USD', 50.9)", "from __main__ import Account4", number=50000)
-    print(f"Instance creation time, simple vs fancy: {simple} vs {fancy}")
-    
-    simple = timeit.timeit("sa.balance = 50.9", "from __main__ import sa", number=50000)
-    fancy = timeit.timeit("a.balance = 50.9", "from __main__ import a", number=50000)
-    print(f"Attr assignment time, simple vs fancy: {simple} vs {fancy}")
+    # The numbers come from the benchmark suite, `python -m bench` compares every implementation.
+    import bench
+    bench.main(['--impl', 'simple', '--impl', 'pt4', '--scenario', 'create',
+                '--scenario', 'set', '--scenario', 'get'])
     # Oh god, that sucks ass.
-
-    simple = timeit.timeit("sa.balance", "from __main__ import sa", number=50000)
-    fancy = timeit.timeit("a.balance", "from __main__ import a", number=50000)
-    print(f"Attr access time, simple vs fancy: {simple} vs {fancy}") 
\ No newline at end of file
@@ -17,9 +17,9 @@ if __name__ == '__main__':
 class AccountMeta(type):
     """Change the formula but keep the flavor"""
     def __new__(mcs, name, bases, namespace):
-        fields =  [name for name, v in namespace.items() if isinstance(v, Descriptor)]
-        for name in fields:
-            namespace[name].name = name
+        fields =  [key for key, v in namespace.items() if isinstance(v, Descriptor)]
+        for field in fields:
+            namespace[field].name = field
 
         if fields:
             exec(make_init(*fields), globals(), namespace)
@@ -39,12 +39,5 @@ class Account(AccountBase):
 
 
 if __name__ == '__main__':
-    import timeit
-
-    instantiation = "a = %s('Fred Fuches', 'USD', 50.9)"
-    setup = "from __main__ import %s"
-    
-    oldschool = timeit.timeit(instantiation % 'SimpleAccount', setup % 'SimpleAccount', number=50000)
-    sigmeta = timeit.timeit(instantiation % 'Account4', setup % 'Account4', number=50000)
-    genmeta = timeit.timeit(instantiation % 'Account', setup % 'Account', number=50000)
-    print(f"Instance creation time, oldschool vs oldmeta vs genmeta: {oldschool} vs {sigmeta} vs {genmeta}")
+    import bench
+    bench.main(['--impl', 'simple', '--impl', 'pt4', '--impl', 'pt5', '--scenario', 'create'])
@@ -1,39 +1,370 @@
+import hashlib
+import linecache
+import math
+import re
+import threading
+import time
+import weakref
+
 from pt5_boost1 import make_init
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Eliminating signature enforcement, but can we push it further?
 # As we can see, the performance of the previous version suffers from stacked `super` invocations.
 # For example, to get PosFloat work, Float.__set__ is called to make type check, then Positive.__set__ is called # to make value check, 
 # we can use code generation to merge these checks together.
+def fuse(derived):
+    # Walked backwards, so that a class may also wrap what comes after it in the mro
+    # with `wrap__set__`, e.g. to skip checks altogether.
+    statements = []
+    for d in reversed(derived.__mro__):
+        if 'wrap__set__' in d.__dict__:
+            statements = list(d.wrap__set__(statements))
+        if 'statement__set__' in d.__dict__:
+            statements = timed_statements(derived, d, d.statement__set__()) + statements
+    return statements
+
+
+# Which check costs what? With `profile_statements(True)`, code generated from then on
+# counts and times every group of fused statements, charged to the class contributing it,
+# per descriptor class: `Typed` first or `Positive` first is a different class, and a
+# different cost. Everything goes through `self`, the descriptor, already bound wherever
+# checks run: the stats live in a class attribute, `_stats_<module>_<contributor>`.
+#
+# Two clock reads cost more than an `isinstance`, so what the clock itself costs is
+# measured once, and taken off the totals.
+_profiling = False
+# descriptor class -> {contributor: StatementStats}
+_statement_stats = weakref.WeakKeyDictionary()
+_clock_ns = 0.0
+
+
+class StatementStats:
+    __slots__ = ('count', 'total_ns')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+
+
+def profile_statements(on=True):
+    """Turns statement profiling on or off, for the code generated afterwards"""
+    global _profiling, _clock_ns
+    if on and not _clock_ns:
+        _clock_ns = calibrate_clock()
+    _profiling = on
+
+
+def calibrate_clock(runs=20000):
+    """Mean ns an empty profiled group measures, the best of a few batches"""
+    code = 'def run(self, runs):\n'
+    code += '    for _ in range(runs):\n'
+    for statement in _timed('_stats', []):
+        code += '        %s\n' % statement
+    env = {}
+    exec(code, env)
+
+    class Probe:
+        _clock = Descriptor._clock
+    best = float('inf')
+    for _ in range(5):
+        Probe._stats = stats = StatementStats()
+        env['run'](Probe(), runs)
+        best = min(best, stats.total_ns / runs)
+    return best
+
+
+def timed_statements(derived, d, statements):
+    statements = list(statements)
+    if not _profiling:
+        return statements
+    attr = '_stats_' + re.sub(r'\W', '_', f'{d.__module__}.{d.__qualname__}')
+    if attr not in derived.__dict__:
+        stats = _statement_stats.setdefault(derived, {}).setdefault(d, StatementStats())
+        setattr(derived, attr, stats)
+    return _timed(attr, statements)
+
+
+def _timed(attr, statements):
+    # Locals named so that no field clashes with them, see `RESERVED`. Only the groups
+    # that get through are counted, a rejected value stops in the middle of one.
+    return ['_stmt_start = self._clock()',
+            *statements,
+            f'_stmt_stats = self.{attr}',
+            '_stmt_stats.total_ns += self._clock() - _stmt_start',
+            '_stmt_stats.count += 1']
+
+
+def statement_stats():
+    """{(descriptor class, contributing class): {'count', 'total_ns', 'mean_ns'}} of the
+    profiled statements, without the cost of the clock reads"""
+    result = {}
+    for derived, contributors in list(_statement_stats.items()):
+        for d, stats in contributors.items():
+            total = max(0, stats.total_ns - round(stats.count * _clock_ns))
+            result[derived, d] = {'count': stats.count, 'total_ns': total,
+                                  'mean_ns': total / stats.count if stats.count else 0.0}
+    return result
+
+# Checks needing the instance, not just the value, go in `statement__guard__`. They only
+# run on assignments, `__set__` and `set_many`, after the fused checks and before the store.
+def guards(derived):
+    return list(derived.statement__guard__()) if hasattr(derived, 'statement__guard__') else []
+
+# Statements turning an accepted value into the one actually stored go in
+# `statement__admit__`. They run right before the stores that fill memory, `__init__`,
+# `set_many` and `prepare` for containers, never on values that are only validated,
+# `validate_many` doesn't see them. Single assignments, `__set__`, skip them too.
+def admits(derived):
+    return list(derived.statement__admit__()) if hasattr(derived, 'statement__admit__') else []
+
 def make__set__(derived):
     code = 'def __set__(self, instance, value):\n'
-    # fusion
-    for d in derived.__mro__:
-        if 'statement__set__' in d.__dict__:
-            for statement in d.statement__set__():
-                code += '    %s\n' % statement
+    # fusion, checks first and the storage write last
+    for statement in fuse(derived) + guards(derived) + list(derived.statement__store__()):
+        code += '    %s\n' % statement
+    return code
+
+# Containers that store values their own way, columns or bytes, still want everything
+# `__set__` checks, guards included: `prepare` runs it all on `instance` but stores nothing,
+# it returns the value `__set__` would have written.
+def make_prepare(derived):
+    code = 'def prepare(self, instance, value):\n'
+    for statement in fuse(derived) + guards(derived) + admits(derived):
+        code += '    %s\n' % statement
+    code += '    return value\n'
+    return code
+
+# The very same fused checks work on a whole batch too, we only need to wrap them
+# in a loop and collect what fails instead of bailing out on the first bad value.
+# One dispatch for the batch, not one per value.
+def make_validate_many(derived):
+    code = 'def validate_many(self, values):\n'
+    code += '    failures = []\n'
+    code += '    for index, value in self.pairs(values):\n'
+    code += '        try:\n'
+    for statement in fuse(derived) or ['pass']:
+        code += '            %s\n' % statement
+    code += '        except (TypeError, ValueError) as exc:\n'
+    code += '            failures.append((index, exc))\n'
+    code += '    return failures\n'
+    return code
+
+def make_set_many(derived):
+    code = 'def set_many(self, instances, values):\n'
+    code += '    if len(instances) != len(values):\n'
+    code += '        raise ValueError("Expected as many values as instances")\n'
+    code += '    failures = self.validate_many(values)\n'
+    if guards(derived):
+        code += '    if not failures:\n'
+        code += '        for index, (instance, value) in enumerate(zip(instances, values)):\n'
+        code += '            try:\n'
+        for statement in guards(derived):
+            code += '                %s\n' % statement
+        code += '            except (TypeError, ValueError) as exc:\n'
+        code += '                failures.append((index, exc))\n'
+    code += '    if failures:\n'
+    code += '        return failures\n'
+    # Store python objects, not numpy scalars.
+    code += '    if np is not None and isinstance(values, np.ndarray):\n'
+    code += '        values = values.tolist()\n'
+    code += '    for instance, value in zip(instances, values):\n'
+    for statement in admits(derived) + list(derived.statement__store__()):
+        code += '        %s\n' % statement
+    code += '    return failures\n'
+    return code
+
+# Reading doesn't need any of this as long as values live in the instance `__dict__`,
+# so `__get__` is only generated for descriptors that say how to fetch a value.
+def make__get__(derived):
+    if not hasattr(derived, 'statement__get__'):
+        return None
+    code = 'def __get__(self, instance, cls):\n'
+    code += '    if instance is None:\n'
+    code += '        return self\n'
+    for statement in derived.statement__get__():
+        code += '    %s\n' % statement
+    return code
+
+# With numpy around, checks that provide a `statement__vector__` are applied to the
+# whole array at once, flagging suspects in `mask`. Only the suspects go through the
+# scalar loop above, so errors come out exactly as `__set__` would raise them.
+# A check without a vector form disables the shortcut for the whole descriptor.
+def make_vector_suspects(derived):
+    checks = [d for d in derived.__mro__ if 'statement__set__' in d.__dict__]
+    if np is None or not all('statement__vector__' in d.__dict__ for d in checks):
+        return None
+    code = 'def vector_suspects(self, values):\n'
+    code += '    mask = np.zeros(len(values), dtype=bool)\n'
+    for d in checks:
+        for statement in d.statement__vector__():
+            code += '    %s\n' % statement
+    code += '    return np.flatnonzero(mask)\n'
     return code
 
+# Class creation and codegen share caches, `_variants`, `_specialised`, and lazy stubs
+# patching classes on first use. Threads defining classes or hitting stubs concurrently
+# go through this lock, one codegen at a time: no class is generated twice, nobody sees
+# two variants of the same thing. Reentrant, generating a class may create others.
+codegen_lock = threading.RLock()
+
+# Every generated function goes through `compile_generated`, which leaves room for
+# swapping in a smarter compiler, e.g. the persistent cache of `pt8_codegen_cache`.
+code_cache = None
+
+# Generated code has no file, tracebacks and profilers would only show `<string>`.
+# Each snippet gets a synthetic filename instead, stable from one run to the next,
+# and its source goes to `linecache`, where tracebacks, `pdb` and `inspect` look for lines.
+# The name is the function's plus a digest of the source: identical snippets of different
+# classes share one filename, and one entry in the code cache.
+def generated_filename(name, source):
+    digest = hashlib.sha1(source.encode()).hexdigest()[:12]
+    return f'<generated {name} {digest}>'
+
+
+def compile_generated(source, filename=None):
+    if filename is None:
+        filename = generated_filename('code', source)
+    # No mtime, `linecache.checkcache` leaves the entry alone.
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    if code_cache is not None:
+        return code_cache.compile(source, filename)
+    return compile(source, filename, 'exec')
+
+
+# Every fused check still pays for `self.expected` or `self.name`, attribute lookups on
+# the descriptor, for values that never change after the class is created. Since we
+# generate code anyway, we can just as well generate it per descriptor *instance*, with
+# those values pasted in: `instance.__dict__['balance'] = value` instead of
+# `instance.__dict__[self.name] = value`. Attributes listed in `folded` are turned into
+# literals when they have one, into globals of the generated function otherwise.
+def literal(value):
+    """Source code for `value`, or None if it can't be written as a literal"""
+    if type(value) in (str, int, bool, type(None)):
+        return repr(value)
+    if type(value) is float and math.isfinite(value):
+        return repr(value)
+    return None
+
+
+SELF_ATTR = re.compile(r'\bself\.(\w+)\b')
+SELF = re.compile(r'\bself\b')
+
+def fold(code, constants, env=None, prefix='_'):
+    """Replaces `self.<attr>` for the attributes in `constants` by their values.
+
+    Values without a literal go to `env` as `prefix + attr`, they are left alone without `env`.
+    """
+    if not constants:
+        return code
+    def replace(match):
+        attr = match.group(1)
+        if attr not in constants:
+            return match.group(0)
+        source = literal(constants[attr])
+        if source is None:
+            if env is None:
+                return match.group(0)
+            source = prefix + attr
+            env[source] = constants[attr]
+        return source
+    return SELF_ATTR.sub(replace, code)
+
+
+def constants_of(descriptor):
+    return getattr(type(descriptor), '_constants', None)
+
+
 # We are gonna need a special classmethod to generate source code,
 # so the creation of __set__ should be after that of the class, in another word,
 # we are employing __init__ to mod a newly created class.
+#
+# With `lazy=True` (inherited by subclasses) the methods are only stubs until the
+# first call to one of them, so importing lots of classes does not pay for codegen.
 class DescriptorMeta(type):
-    def __init__(self, name, bases, namespace):
-        if '__set__' not in namespace:
-            code = make__set__(self)
-            exec(code, globals(), namespace)
-            setattr(self, '__set__', namespace['__set__'])
-        else:
+    generators = {
+        '__set__': make__set__,
+        '__get__': make__get__,
+        'prepare': make_prepare,
+        'validate_many': make_validate_many,
+        'set_many': make_set_many,
+        'vector_suspects': make_vector_suspects,
+    }
+
+    def __new__(mcs, name, bases, namespace, lazy=None):
+        return super().__new__(mcs, name, bases, namespace)
+
+    def __init__(self, name, bases, namespace, lazy=None):
+        if '__set__' in namespace:
             raise NotImplementedError('There is no method to generate __set__ source')
+        if lazy is not None:
+            self._lazy = lazy
+        if getattr(self, '_lazy', False):
+            for method, generator in self.generators.items():
+                if method != '__get__' or hasattr(self, 'statement__get__'):
+                    setattr(self, method, self.stub(method))
+        else:
+            self.generate()
 
+    def generate(self):
+        namespace = {}
+        constants = getattr(self, '_constants', None)
+        env = dict(globals()) if constants else globals()
+        for method, generator in self.generators.items():
+            code = generator(self)
+            if code is not None:
+                code = fold(code, constants, env)
+                exec(compile_generated(code, generated_filename(method, code)), env, namespace)
+                namespace[method].__module__ = self.__module__
+                namespace[method].__qualname__ = f'{self.__qualname__}.{method}'
+                setattr(self, method, namespace[method])
+            elif hasattr(self.__dict__.get(method), 'stubbed'):
+                delattr(self, method)
 
+    def stub(self, method):
+        def stub(*args):
+            if self.__dict__.get(method) is stub:
+                with codegen_lock:
+                    if self.__dict__.get(method) is stub:
+                        self.generate()
+            return getattr(self, method)(*args)
+        stub.stubbed = method
+        stub.__module__ = self.__module__
+        stub.__qualname__ = f'{self.__qualname__}.{method}'
+        return stub
 class Descriptor(metaclass=DescriptorMeta):
+    # Attributes which can be folded into the generated code, see `specialise`.
+    folded = ('name',)
+    # For `profile_statements`, a builtin is not bound as a method.
+    _clock = time.perf_counter_ns
+
     def __init__(self, name=None):
         self.name = name
 
     @staticmethod
-    def statement__set__():
+    def statement__store__():
         return ('instance.__dict__[self.name] = value',)
 
+    # The reverse of the store, reading the raw value back into `value`.
+    @staticmethod
+    def statement__load__():
+        return ('value = instance.__dict__[self.name]',)
+
+    def pairs(self, values):
+        """(index, value) pairs validate_many has to check"""
+        if np is not None and isinstance(values, np.ndarray) and values.ndim == 1:
+            suspects = self.vector_suspects(values)
+            if suspects is not None:
+                return zip(suspects.tolist(), values[suspects].tolist())
+        return enumerate(values)
+
+    def vector_suspects(self, values):
+        return None
+
     def __delete__(self, instance):
         # del instance.__dict__[self.name]
         raise AttributeError('not allowed')
@@ -44,12 +375,55 @@ class Positive(Descriptor):
     def statement__set__():
         return ('if value < 0:', '    raise ValueError("Expect a positive value")')
 
+    @staticmethod
+    def statement__vector__():
+        return ('mask |= values < 0',)
+
 
 class Typed(Descriptor):
+    folded = ('expected',)
+
     @staticmethod
     def statement__set__():
         return ('if not isinstance(value, self.expected):', '    raise TypeError("Expected %s" % self.expected)')
 
+    @staticmethod
+    def statement__vector__():
+        return ('if not issubclass(values.dtype.type, self.expected):', '    return None')
+
+
+# With folding, parameters cost nothing: `Range(0, 100)` runs `if not 0 <= value <= 100`.
+# The parameters are keyword-only, so these mix with any other descriptor.
+class MaxSized(Descriptor):
+    folded = ('maxlen',)
+
+    def __init__(self, *args, maxlen, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.maxlen = maxlen
+
+    @staticmethod
+    def statement__set__():
+        return ('if len(value) > self.maxlen:',
+                '    raise ValueError("Expected at most %d items" % self.maxlen)')
+
+
+class Range(Descriptor):
+    folded = ('lo', 'hi')
+
+    def __init__(self, *args, lo, hi, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lo, self.hi = lo, hi
+
+    @staticmethod
+    def statement__set__():
+        return ('if not self.lo <= value <= self.hi:',
+                '    raise ValueError("Expected a value within [%s, %s]" % (self.lo, self.hi))')
+
+    # Negated like the scalar check, so that NaN, outside of every range, is a suspect too.
+    @staticmethod
+    def statement__vector__():
+        return ('mask |= ~((values >= self.lo) & (values <= self.hi))',)
+
 
 class Float(Typed):
     expected = float
@@ -63,42 +437,325 @@ class PosFloat(Float, Positive):
 
 print(make__set__(PosFloat))
 
+# Every instance still drags a `__dict__` around, that's a lot of memory for three values.
+# `__slots__` would fix it, but our descriptors write straight into `instance.__dict__`.
+# The metaclass knows every field before the class exists, so it can lay out a hidden
+# slot per field, and switch the descriptors to a flavor storing values in those slots.
+# The slot itself is a member descriptor, a tiny C-level getter/setter.
+#
+# Reads can't skip our python `__get__`, but they can skip the call to `slot.__get__`:
+# once specialised, the slot name is known, and `instance._slot_balance` is a plain
+# attribute read the interpreter specialises for slots. Close to twice as fast.
+# Stores likewise, `instance._slot_balance = value`.
+class Slotted(Descriptor):
+    slot = None
+    folded = ('slot',)
+
+    @classmethod
+    def statement__store__(derived):
+        slot = derived.slot_attr()
+        if slot is None:
+            return ('self.slot.__set__(instance, value)',)
+        return (f'{slot} = value',)
+
+    @classmethod
+    def statement__load__(derived):
+        return ('value = %s' % derived.read_slot(),)
+
+    @classmethod
+    def statement__get__(derived):
+        return ('return %s' % derived.read_slot(),)
+
+    @classmethod
+    def read_slot(derived):
+        return derived.slot_attr() or 'self.slot.__get__(instance, None)'
+
+    @classmethod
+    def slot_attr(derived):
+        """`instance.<slot name>` once specialised, None before"""
+        slot = (getattr(derived, '_constants', None) or {}).get('slot')
+        return None if slot is None else f'instance.{slot.__name__}'
+
+
+# There's still one python call per field in `__init__`, since `self.x = x` goes through
+# the descriptor protocol. But the checks are just strings, so why not paste them
+# right into `__init__`? Each field binds its descriptor to `self` and the argument to
+# `value`, which is all the fused statements need, then the checks and the write follow.
+RESERVED = ('self', 'instance', 'value', '_descriptors', '_stmt_start', '_stmt_stats')
+
+def make_fused_init(fields, descriptors, env=None):
+    code = f'def __init__(instance, {", ".join(fields)}):\n'
+    for i, (field, descriptor) in enumerate(zip(fields, descriptors)):
+        statements = fuse(type(descriptor)) + admits(type(descriptor)) + list(descriptor.statement__store__())
+        body = fold('\n'.join(statements), constants_of(descriptor), env, f'_{i}_')
+        # Once everything is folded, the descriptor itself may not be needed at all.
+        if SELF.search(body):
+            code += f'    self = _descriptors[{i}]\n'
+        code += f'    value = {field}\n'
+        for statement in body.split('\n'):
+            code += '    %s\n' % statement
+    return code
+
+
+def build_init(cls, fields, descriptors):
+    """Generates `__init__` for `fields`, with validation inlined unless a field name clashes"""
+    if set(fields) & set(RESERVED):
+        code, env = make_init(*fields), {}
+    else:
+        env = {'_descriptors': tuple(descriptors)}
+        code = make_fused_init(fields, descriptors, env)
+    return define(cls, '__init__', code, env)
+
+
+# Generated functions should look like they were written in the class body, pickle finds
+# functions by module and qualified name, e.g. `Account.__init__` in the class's module.
+def define(cls, name, code, env):
+    env['__name__'] = cls.__module__
+    exec(compile_generated(code, generated_filename(name, code)), env)
+    func = env[name]
+    func.__qualname__ = f'{cls.__qualname__}.{name}'
+    return func
+
+
+# Values validated elsewhere, by a worker process or by our own database, only need the
+# storage writes. Same statements as `__init__`, minus the checks.
+def make_from_values(fields, descriptors, env=None):
+    code = 'def from_values(values):\n'
+    code += '    instance = _cls.__new__(_cls)\n'
+    code += f'    {", ".join(fields)}, = values\n'
+    for i, (field, descriptor) in enumerate(zip(fields, descriptors)):
+        code += f'    self, value = _descriptors[{i}], {field}\n'
+        for statement in descriptor.statement__store__():
+            code += '    %s\n' % fold(statement, constants_of(descriptor), env, f'_{i}_')
+    code += '    return instance\n'
+    return code
+
+
+def build_from_values(cls):
+    """Returns values -> instance of `cls`, storing the values without validating them"""
+    fields = cls._fields
+    if set(fields) & set(RESERVED + ('_cls',)):
+        return lambda values: cls(*values)
+    descriptors = [cls.__dict__[field] for field in fields]
+    env = {'_cls': cls, '_descriptors': tuple(descriptors)}
+    return define(cls, 'from_values', make_from_values(fields, descriptors, env), env)
+
+
+def lazy_init(cls, fields, descriptors):
+    """Stub generating the real `__init__` of `cls` on first instantiation"""
+    def __init__(instance, *args, **kwargs):
+        if cls.__dict__['__init__'] is __init__:
+            with codegen_lock:
+                if cls.__dict__['__init__'] is __init__:
+                    setattr(cls, '__init__', type(cls).generate_init(cls, fields, descriptors))
+        cls.__dict__['__init__'](instance, *args, **kwargs)
+    __init__.__qualname__ = f'{cls.__qualname__}.__init__'
+    return __init__
+
+
+_variants = {}
+
+def variant(mixin, derived):
+    """Returns (and caches) the descriptor class mixing `mixin` on top of `derived`"""
+    key = (mixin, derived)
+    try:
+        return _variants[key]
+    except KeyError:
+        pass
+    with codegen_lock:
+        if key not in _variants:
+            name = mixin.__name__ + derived.__name__
+            _variants[key] = type(derived)(name, (mixin, derived), {})
+        return _variants[key]
+
+
+# Specialised classes are plain subclasses carrying the folded values in `_constants`,
+# `DescriptorMeta.generate` folds them into every method it generates. Descriptors with
+# the same class and the same values share one specialised class, and its code.
+# They are lazy, defining a class only costs the codegen of the methods actually used,
+# and weakly cached, they go away with the record classes using them.
+_specialised = weakref.WeakValueDictionary()
+
+def specialise(descriptor):
+    """Switches `descriptor` to a class generated for its current `folded` attribute values"""
+    derived = type(descriptor)
+    attrs = derived.__dict__.get('_folded_attrs')
+    if attrs is None:
+        attrs = []
+        for d in reversed(derived.__mro__):
+            attrs += [attr for attr in d.__dict__.get('folded', ()) if attr not in attrs]
+        derived._folded_attrs = attrs
+    constants = tuple((attr, getattr(descriptor, attr, None)) for attr in attrs)
+    # Types too, 1 == 1.0 == True would share a class otherwise.
+    key = (derived, constants, tuple(type(value) for _, value in constants))
+    with codegen_lock:
+        try:
+            specialised = _specialised.get(key)
+        except TypeError:
+            # Unhashable parameters, stay generic.
+            return
+        if specialised is None:
+            namespace = {'_constants': dict(constants)}
+            specialised = _specialised[key] = type(derived)(derived.__name__, (derived,), namespace, lazy=True)
+    descriptor.__class__ = specialised
+
+
+def slot_name(field):
+    return f'_slot_{field}'
+
+
 class AccountMeta(type):
     """Change the formula but keep the flavor"""
-    def __new__(mcs, name, bases, namespace):
-        fields =  [name for name, v in namespace.items() if isinstance(v, Descriptor)]
-        for name in fields:
-            namespace[name].name = name
+    def __new__(mcs, name, bases, namespace, slots=False, lazy=None):
+        fields =  [key for key, v in namespace.items() if isinstance(v, Descriptor)]
+        for field in fields:
+            namespace[field].name = field
 
-        if fields:
-            exec(make_init(*fields), globals(), namespace)
+        if slots:
+            namespace['__slots__'] = tuple(slot_name(field) for field in fields)
 
         new_cls = super().__new__(mcs, name, bases, namespace)
+        for field in fields:
+            descriptor = namespace[field]
+            for mixin in mcs.descriptor_mixins(new_cls, slots):
+                descriptor.__class__ = variant(mixin, type(descriptor))
+            if slots:
+                descriptor.slot = new_cls.__dict__[slot_name(field)]
+            specialise(descriptor)
+        if lazy is not None:
+            new_cls._lazy = lazy
+        # Generated last, the inlined statements depend on the final descriptor flavors.
+        if fields:
+            descriptors = [namespace[field] for field in fields]
+            if getattr(new_cls, '_lazy', False):
+                setattr(new_cls, '__init__', lazy_init(new_cls, fields, descriptors))
+            else:
+                setattr(new_cls, '__init__', mcs.generate_init(new_cls, fields, descriptors))
         setattr(new_cls, '_fields', fields)
         return new_cls
 
+    # Hooks for metaclasses built on top of this one.
+    def descriptor_mixins(cls, slots):
+        """Flavors mixed into the field descriptors of `cls`, innermost first"""
+        return [Slotted] if slots else []
+
+    def generate_init(cls, fields, descriptors):
+        return build_init(cls, fields, descriptors)
+
+def _generated_source(obj):
+    func = getattr(obj, '__func__', obj)
+    code = getattr(func, '__code__', None)
+    if code is None or not code.co_filename.startswith('<generated'):
+        return None
+    return ''.join(linecache.getlines(code.co_filename))
+
+
+def generated_source(cls):
+    """Source of the code generated for `cls`, its field descriptors included.
+
+    Lazy methods not generated yet are left out.
+    """
+    owners = [(cls.__qualname__, vars(cls))]
+    for field in getattr(cls, '_fields', ()):
+        descriptor = cls.__dict__.get(field)
+        if isinstance(descriptor, Descriptor):
+            owners.append((f'{cls.__qualname__}.{field}', vars(type(descriptor))))
+            owners.append((f'{cls.__qualname__}.{field}', vars(descriptor)))
+    parts = []
+    for owner, namespace in owners:
+        for name, obj in namespace.items():
+            source = _generated_source(obj)
+            if source:
+                parts.append(f'# {owner}.{name}\n{source}')
+    return '\n'.join(parts)
+
+
+class ValidationError(ValueError):
+    """Every failure of a bulk update, `failures` is [(index, exception)]"""
+    def __init__(self, field, failures):
+        self.field = field
+        self.failures = failures
+        shown = ', '.join(f'#{index}: {exc}' for index, exc in failures[:5])
+        more = f' and {len(failures) - 5} more' if len(failures) > 5 else ''
+        super().__init__(f'{len(failures)} invalid values for {field!r}: {shown}{more}')
+
+
+# Without an empty `__slots__` here, every subclass would get a `__dict__` anyway.
 class AccountBase(metaclass=AccountMeta):
-    pass
+    __slots__ = ()
+
+    @classmethod
+    def update_field(cls, instances, field, values):
+        """Assigns `values[i]` to `field` of `instances[i]`, all of them or none.
+
+        The whole batch is validated first, vectorized for numpy arrays, with `validate_many`.
+        Raises `ValidationError` listing every invalid value, nothing is written then.
+        """
+        # `_fields` only lists the fields a class declares itself, inherited ones count too.
+        descriptor = next((k.__dict__[field] for k in cls.__mro__
+                           if field in getattr(k, '_fields', ()) and field in k.__dict__), None)
+        if descriptor is None:
+            raise AttributeError(f'{cls.__name__} has no field {field!r}')
+        failures = descriptor.set_many(instances, values)
+        if failures:
+            raise ValidationError(field, failures)
 
 class Account(AccountBase):
     name = String()
     currency = String()
     balance = PosFloat()
 
+class SlottedAccount(AccountBase, slots=True):
+    name = String()
+    currency = String()
+    balance = PosFloat()
+
 
 if __name__ == '__main__':
+    import bench
     import timeit
-    from pt4_master_of_dot import Account4, SimpleAccount
+    bench.main(['--impl', 'simple', '--impl', 'pt4', '--impl', 'pt6', '--impl', 'pt6-slotted'])
 
-    assign = "%s.balance = 50.9"
-    setup = "from __main__ import %s"
-    
-    a1 = SimpleAccount('Fred Fuches', 'USD', 0.9)
-    a2 = Account4('Fred Fuches', 'USD', 0.9)
     a3 = Account('Fred Fuches', 'USD', 0.9)
+    balances = [float(i) for i in range(100000)]
+    balances[7], balances[42] = -1.0, '42'
+    print(Account.__dict__['balance'].validate_many(balances))
+
+    def one_by_one():
+        for value in balances:
+            try:
+                a3.balance = value
+            except (TypeError, ValueError):
+                pass
+    batch = timeit.timeit(lambda: Account.__dict__['balance'].validate_many(balances), number=10)
+    single = timeit.timeit(one_by_one, number=10)
+    print(f"Validating 100k balances, one by one vs batch: {single} vs {batch}")
+
+    # End of day: new balances for everyone, validated as one batch and written in one pass.
+    accounts = [Account('Fred Fuches', 'USD', float(i)) for i in range(100000)]
+    deltas = [0.5] * len(accounts)
+
+    def looped():
+        for a, d in zip(accounts, deltas):
+            a.balance = a.balance + d
+    bulk = timeit.timeit(lambda: Account.update_field(
+        accounts, 'balance', [a.balance + d for a, d in zip(accounts, deltas)]), number=10)
+    print(f"Updating 100k balances, loop vs update_field: {timeit.timeit(looped, number=10)} vs {bulk}")
+    try:
+        Account.update_field(accounts[:3], 'balance', [1.0, -1.0, '2'])
+    except ValidationError as e:
+        print(e, accounts[0].balance)
+
+    # Parameters are folded into the code, a range check costs what a sign check costs.
+    class Percentage(Float, Range):
+        pass
+
+    class Ranged(AccountBase):
+        name = String()
+        currency = String()
+        balance = Percentage(lo=0.0, hi=100.0)
 
-    oldschool = timeit.timeit(assign % 'a1', setup % 'a1', number=50000)
-    sigmeta = timeit.timeit(assign % 'a2', setup % 'a2', number=50000)
-    genmeta = timeit.timeit(assign % 'a3', setup % 'a3', number=50000)
-    print(f"Assignment time, oldschool vs oldmeta vs genmeta: {oldschool} vs {sigmeta} vs {genmeta}")
-    
\ No newline at end of file
+    r = Ranged('Fred Fuches', 'USD', 0.9)
+    positive = min(timeit.repeat('a3.balance = 1.0', globals=globals(), number=200000))
+    ranged = min(timeit.repeat('r.balance = 1.0', globals=globals(), number=200000))
+    print(f"Assignment, PosFloat vs Range(0.0, 100.0): {positive:.3f}s vs {ranged:.3f}s")
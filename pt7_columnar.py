@@ -0,0 +1,231 @@
+from array import array
+import sys
+
+from pt6_boost2 import AccountBase, Account
+from pt21_invariants import check_records
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Our descriptors are fast now, but every `Account` is still a standalone object
+# carrying its own `__dict__`. Hold a few million of them and you pay hundreds of bytes
+# per record just for the bookkeeping.
+#
+# The descriptors already know what every field looks like: `Float` expects a float,
+# `String` expects a str. So instead of storing rows of objects, we can flip the layout
+# and store one packed column per field, a.k.a. struct-of-arrays:
+#
+#   name:     ['Fred Fuches', 'Crab', ...]   <- references to interned strs
+#   currency: ['USD', 'USD', ...]            <- same 'USD' object, over and over
+#   balance:  array('d', [50.9, 0.9, ...])   <- one machine word per value
+#
+# The typecode of each column is derived from the descriptor's `expected` type.
+TYPECODES = {float: 'd', int: 'q'}
+
+
+def make_column(descriptor):
+    typecode = TYPECODES.get(getattr(descriptor, 'expected', None))
+    return array(typecode) if typecode else []
+
+
+# Validation is still done by the descriptors, we don't want to repeat ourselves.
+# Appending rows is like calling the constructor: `validate_many` runs the fused checks
+# column by column, then `check_records` the invariants of pt21, row by row.
+# Assigning a cell is like `__set__`: `prepare` runs the checks and the guards, with the
+# row view standing in for the instance.
+# Rows are handed out as light views: two slots, and a property per field
+# reading from (or validating into) the right column. Just like `make_init`,
+# the properties are generated from the field list.
+def make_row(fields):
+    code = ''
+    for i, name in enumerate(fields):
+        code += '@property\n'
+        code += f'def {name}(self):\n'
+        code += f'    return self._table._columns[{i}][self._index]\n'
+        code += f'@{name}.setter\n'
+        code += f'def {name}(self, value):\n'
+        code += f'    self._table._set({i}, self._index, value)\n'
+    return code
+
+
+def _row_init(self, table, index):
+    self._table = table
+    self._index = index
+
+
+def _row_repr(self):
+    values = ', '.join(repr(getattr(self, name)) for name in self._fields)
+    return f'{type(self).__name__}({values})'
+
+
+_row_classes = {}
+
+def row_class(record_cls):
+    """Returns the view class mimicking `record_cls`, one per record class"""
+    try:
+        return _row_classes[record_cls]
+    except KeyError:
+        pass
+    namespace = {
+        '__slots__': ('_table', '_index'),
+        '__init__': _row_init,
+        '__repr__': _row_repr,
+        '_fields': record_cls._fields,
+    }
+    exec(make_row(record_cls._fields), globals(), namespace)
+    row_cls = type(f'{record_cls.__name__}Row', (), namespace)
+    # Threads racing here build a class each, all of them get the first one.
+    return _row_classes.setdefault(record_cls, row_cls)
+
+
+class Table:
+    """Columnar storage for instances of an `AccountBase` subclass.
+
+    Rows get the checks the record class itself would run: appended rows those of the
+    constructor, field checks and invariants, assigned cells those of `__set__`, field
+    checks and guards. Only `validated=True` skips them, for rows checked already.
+    """
+    def __init__(self, record_cls, rows=(), validated=False):
+        if not issubclass(record_cls, AccountBase):
+            raise TypeError('Expected an AccountBase subclass')
+        self.record_cls = record_cls
+        self._fields = record_cls._fields
+        self._descriptors = [record_cls.__dict__[name] for name in self._fields]
+        self._columns = [make_column(d) for d in self._descriptors]
+        self._row_cls = row_class(record_cls)
+        self.extend(rows, validated)
+
+    def _set(self, i, index, value):
+        value = self._descriptors[i].prepare(self._row_cls(self, index), value)
+        if isinstance(value, str):
+            value = sys.intern(value)
+        self._columns[i][index] = value
+
+    def append(self, *args, **kwargs):
+        """Appends one record, arguments are the same as the record constructor's"""
+        self.extend([self._bind(args, kwargs)])
+
+    def _bind(self, args, kwargs):
+        if len(args) + len(kwargs) != len(self._fields):
+            raise TypeError(f'Expected {len(self._fields)} arguments')
+        row = list(args)
+        for name in self._fields[len(args):]:
+            row.append(kwargs.pop(name))
+        if kwargs:
+            raise TypeError(f'Unexpected arguments {list(kwargs)}')
+        return row
+
+    def extend(self, rows, validated=False):
+        """Bulk append of field tuples, nothing is appended unless every row is valid.
+        Pass `validated=True` for rows already checked by the descriptors and invariants.
+        """
+        rows = list(rows)
+        for row in rows:
+            if len(row) != len(self._fields):
+                raise TypeError(f'Expected {len(self._fields)} values, got {len(row)}')
+        columns = [list(values) for values in zip(*rows)] or [[] for _ in self._fields]
+        self._append_columns(columns, validated)
+
+    def extend_columns(self, columns, validated=False):
+        """Bulk append of whole columns, one sequence per field, in field order"""
+        if len(columns) != len(self._fields) or len({len(c) for c in columns}) > 1:
+            raise ValueError(f'Expected {len(self._fields)} columns of the same length')
+        self._append_columns(columns, validated)
+
+    def _append_columns(self, columns, validated):
+        if not validated:
+            for descriptor, values in zip(self._descriptors, columns):
+                failures = descriptor.validate_many(values)
+                if failures:
+                    raise failures[0][1]
+            failures = check_records(self.record_cls, list(zip(*columns)))
+            if failures:
+                raise failures[0][1]
+        for column, values in zip(self._columns, columns):
+            if not isinstance(column, array):
+                values = [sys.intern(v) if isinstance(v, str) else v for v in values]
+            column.extend(values)
+
+    def __len__(self):
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('row index out of range')
+        return self._row_cls(self, index)
+
+    def __iter__(self):
+        row_cls = self._row_cls
+        for index in range(len(self)):
+            yield row_cls(self, index)
+
+    def column(self, name):
+        """Returns the column of `name`, an `array` for numeric fields and a list otherwise.
+        Treat it as read-only, writes would skip validation.
+        """
+        return self._columns[self._fields.index(name)]
+
+    def to_numpy(self, name):
+        """Zero-copy numpy view of a numeric column"""
+        if np is None:
+            raise ImportError('numpy is required for to_numpy()')
+        column = self.column(name)
+        if not isinstance(column, array):
+            return np.array(column, dtype=object)
+        return np.frombuffer(column, dtype=column.typecode)
+
+    def nbytes(self):
+        """Rough size of the columns, shared string objects are not counted"""
+        return sum(sys.getsizeof(column) for column in self._columns)
+
+
+if __name__ == '__main__':
+    import timeit
+    import tracemalloc
+
+    rows = [(f'Fred Fuches {i % 1000}', 'USD', float(i)) for i in range(100000)]
+
+    tracemalloc.start()
+    objects = [Account(*row) for row in rows]
+    per_object = tracemalloc.get_traced_memory()[0] / len(objects)
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    table = Table(Account, rows)
+    per_row = tracemalloc.get_traced_memory()[0] / len(table)
+    tracemalloc.stop()
+    print(f'Memory per record, objects vs columns: {per_object:.0f} vs {per_row:.0f} bytes')
+
+    scan_objects = timeit.timeit(lambda: sum(a.balance for a in objects), number=10)
+    scan_column = timeit.timeit(lambda: sum(table.column('balance')), number=10)
+    print(f'Balance scan time, objects vs columns: {scan_objects} vs {scan_column}')
+
+    row = table[42]
+    print(row, row.balance)
+
+    from pt21_invariants import ConstrainedBase, invariant
+    from pt6_boost2 import PosFloat, String
+
+    class Limited(ConstrainedBase):
+        currency = String()
+        balance = PosFloat()
+
+        @invariant
+        def below_limit(currency, balance):
+            return balance < 10.0 or currency == 'USD'
+
+    # Cross-field rules hold in the columns too, appended or assigned.
+    limited = Table(Limited, [('USD', 20.0), ('EUR', 5.0)])
+    try:
+        limited.append('EUR', 20.0)
+    except ValueError as e:
+        print(f'Append rejected: {e}')
+    try:
+        limited[1].balance = 20.0
+    except ValueError as e:
+        print(f'Assignment rejected: {e}')
+    print(list(limited))
@@ -0,0 +1,136 @@
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+import tempfile
+
+import pt6_boost2
+
+# Code generation is cheap per class, but it isn't free: every `AccountMeta` class compiles
+# an `__init__`, every `DescriptorMeta` class compiles a whole bunch of methods, and all of it
+# happens at import time. Define a few hundred record classes and short-lived workers spend
+# a good part of their life in `compile`.
+#
+# The generated source of a class is the same from one run to the next, so is the
+# code object it compiles to. Python caches compiled modules in `__pycache__`,
+# we can do the same for our generated snippets: hash the source, marshal the code object.
+# The interpreter version and the bytecode magic go into the key, since code objects
+# are not portable across versions.
+class CodeCache:
+    """Disk cache for code objects compiled from generated source"""
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.path.join(tempfile.gettempdir(), 'pt8-codegen-cache')
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._memory = {}
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(source, filename):
+        digest = hashlib.sha256()
+        for part in (sys.version, importlib.util.MAGIC_NUMBER.hex(), filename, source):
+            digest.update(part.encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def compile(self, source, filename='<generated>'):
+        key = self.key(source, filename)
+        code = self._memory.get(key)
+        if code is not None:
+            self.hits += 1
+            return code
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, 'rb') as f:
+                code = marshal.load(f)
+            self.hits += 1
+        except (OSError, EOFError, ValueError, TypeError):
+            code = compile(source, filename, 'exec')
+            self.misses += 1
+            self._store(path, code)
+        self._memory[key] = code
+        return code
+
+    def _store(self, path, code):
+        # Write then rename, concurrent processes never see a half written entry.
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(code, f)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def clear(self):
+        self._memory.clear()
+        for entry in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, entry))
+
+
+def install(directory=None):
+    """Routes codegen of `pt6_boost2` through a `CodeCache`, call it before defining classes"""
+    cache = CodeCache(directory)
+    pt6_boost2.code_cache = cache
+    return cache
+
+# The other half of the trick is not to generate at all until needed, pass `lazy=True`:
+#
+#   class Model(AccountBase, lazy=True):
+#       pass
+#
+#   class Account(Model):               # `__init__` compiled on the first Account(...)
+#       ...
+#
+#   class LazyPosFloat(PosFloat, lazy=True):
+#       pass                            # `__set__` & co compiled on the first assignment
+
+
+# A startup benchmark: a synthetic module with N record classes, imported in a fresh process.
+def make_module(n, fields=5, lazy=False):
+    code = 'from pt6_boost2 import AccountBase, Descriptor, PosFloat, String\n\n'
+    code += f'class Model(AccountBase, lazy={lazy}):\n    pass\n\n'
+    for i in range(n):
+        # A descriptor class of their own as well, most real models have a few.
+        code += f'class Amount{i}(PosFloat, lazy={lazy}):\n    pass\n\n'
+        code += f'class Record{i}(Model):\n'
+        for j in range(fields):
+            kind = f'Amount{i}' if j % 2 else 'String'
+            code += f'    field{j} = {kind}()\n'
+        code += '\n'
+    return code
+
+
+def time_import(module_dir, cache_dir=None):
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = 'import time, io, contextlib\n'
+    script += 'with contextlib.redirect_stdout(io.StringIO()):\n'
+    script += '    import pt6_boost2\n'
+    if cache_dir:
+        script += '    import pt8_codegen_cache\n'
+        script += f'    pt8_codegen_cache.install({cache_dir!r})\n'
+    script += '    start = time.perf_counter()\n'
+    script += '    import synthetic_models\n'
+    script += 'print(time.perf_counter() - start)\n'
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([here, module_dir]), PYTHONDONTWRITEBYTECODE='1')
+    out = subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return float(out.split()[-1])
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        module = os.path.join(tmp, 'synthetic_models.py')
+        for lazy in (False, True):
+            with open(module, 'w') as f:
+                f.write(make_module(n, lazy=lazy))
+            plain = time_import(tmp)
+            cold = time_import(tmp, cache_dir)
+            warm = time_import(tmp, cache_dir)
+            print(f'Importing {n} classes (lazy={lazy}), plain vs cold cache vs warm cache: '
+                  f'{plain:.3f}s vs {cold:.3f}s vs {warm:.3f}s')